@@ -15,7 +15,9 @@ Usage:
     resp = client.get("/api/v1/private/orders?user_id=1")
 """
 
+import threading
 import time
+from typing import Dict, Tuple
 try:
     from nacl.signing import SigningKey
 except ImportError:
@@ -23,9 +25,18 @@ except ImportError:
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     raise ImportError("requests not installed. Run: pip install requests")
 
+# orjson is optional: fall back to stdlib json when it is not installed
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
 
 # =============================================================================
 # Base62 Encoding
@@ -71,6 +82,26 @@ def base62_decode(s: str) -> bytes:
     return num.to_bytes(max(byte_length, 1), 'big')
 
 
+# =============================================================================
+# Response Parsing
+# =============================================================================
+
+def parse_json(resp: requests.Response):
+    """
+    Decode a JSON response body.
+    
+    Parses resp.content (bytes) directly, with orjson when installed, which
+    skips requests' charset detection and text decode. Raises ValueError
+    on invalid JSON, like resp.json().
+    """
+    return _loads(resp.content)
+
+
+def body_snippet(resp: requests.Response, limit: int = 200) -> str:
+    """First `limit` bytes of the body for error reports, decoded leniently"""
+    return resp.content[:limit].decode("utf-8", "replace")
+
+
 # =============================================================================
 # API Client with Ed25519 Authentication
 # =============================================================================
@@ -86,9 +117,25 @@ class ApiClient:
         {api_key}{ts_nonce}{method}{path}{body}
     
     Note: Server currently uses empty string for body in signature verification.
+    
+    Thread safety: the server rejects any ts_nonce not greater than the last
+    one it saw for this key (a compare-and-swap on arrival), so requests
+    must reach it in nonce order, not just be signed in order. Each request
+    is therefore signed *and sent* under a per-client lock held for the
+    whole round trip: signed requests on one key never overlap on the wire,
+    however many threads share the client. Only requests on different keys
+    (and unsigned public reads) run in parallel. Share one client per key
+    across threads; do not create several clients for the same key.
+    
+    Transport: HTTP/1.1 keep-alive via a pooled requests.Session. The
+    gateway (axum built without the http2 feature) does not speak HTTP/2,
+    and the ts_nonce ordering above rules out multiplexing requests for one
+    key anyway, so an HTTP/2 client would not add concurrency here.
     """
     
     DEFAULT_BASE_URL = "http://localhost:8080"
+    POOL_CONNECTIONS = 4
+    POOL_MAXSIZE = 16
     
     def __init__(
         self, 
@@ -108,6 +155,13 @@ class ApiClient:
         self.base_url = base_url or self.DEFAULT_BASE_URL
         self.signing_key = SigningKey(bytes.fromhex(private_key_hex))
         self.last_ts_nonce = 0
+        self._lock = threading.Lock()
+        # Keep-alive session: reuses TCP connections across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.POOL_CONNECTIONS,
+                              pool_maxsize=self.POOL_MAXSIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
     
     def _get_ts_nonce(self) -> str:
         """
@@ -145,7 +199,7 @@ class ApiClient:
         
         Args:
             path: Request path (e.g., "/api/v1/private/orders")
-            **kwargs: Additional arguments passed to requests.get
+            **kwargs: Additional arguments passed to session.get
             
         Returns:
             Response object
@@ -159,15 +213,15 @@ class ApiClient:
             req.prepare_url(f"http://placeholder{path}", params)
             signed_path = req.url.replace("http://placeholder", "")
             
-        auth = self._sign_request("GET", signed_path)
         headers = kwargs.pop("headers", {})
-        headers["Authorization"] = auth
-        return requests.get(
-            f"{self.base_url}{path}",
-            headers=headers,
-            timeout=kwargs.get("timeout", 10),
-            **kwargs
-        )
+        with self._lock:
+            headers["Authorization"] = self._sign_request("GET", signed_path)
+            return self.session.get(
+                f"{self.base_url}{path}",
+                headers=headers,
+                timeout=kwargs.get("timeout", 10),
+                **kwargs
+            )
     
     def post(self, path: str, json_body: dict = None, **kwargs) -> requests.Response:
         """
@@ -179,22 +233,22 @@ class ApiClient:
         Args:
             path: Request path (e.g., "/api/v1/private/order")
             json_body: JSON body to send
-            **kwargs: Additional arguments passed to requests.post
+            **kwargs: Additional arguments passed to session.post
             
         Returns:
             Response object
         """
-        # Server uses empty body for signature verification
-        auth = self._sign_request("POST", path, "")
         headers = kwargs.pop("headers", {})
-        headers["Authorization"] = auth
-        return requests.post(
-            f"{self.base_url}{path}",
-            headers=headers,
-            json=json_body,
-            timeout=kwargs.get("timeout", 10),
-            **kwargs
-        )
+        with self._lock:
+            # Server uses empty body for signature verification
+            headers["Authorization"] = self._sign_request("POST", path, "")
+            return self.session.post(
+                f"{self.base_url}{path}",
+                headers=headers,
+                json=json_body,
+                timeout=kwargs.get("timeout", 10),
+                **kwargs
+            )
     
     def delete(self, path: str, **kwargs) -> requests.Response:
         """
@@ -202,20 +256,20 @@ class ApiClient:
         
         Args:
             path: Request path
-            **kwargs: Additional arguments passed to requests.delete
+            **kwargs: Additional arguments passed to session.delete
             
         Returns:
             Response object
         """
-        auth = self._sign_request("DELETE", path)
         headers = kwargs.pop("headers", {})
-        headers["Authorization"] = auth
-        return requests.delete(
-            f"{self.base_url}{path}",
-            headers=headers,
-            timeout=kwargs.get("timeout", 10),
-            **kwargs
-        )
+        with self._lock:
+            headers["Authorization"] = self._sign_request("DELETE", path)
+            return self.session.delete(
+                f"{self.base_url}{path}",
+                headers=headers,
+                timeout=kwargs.get("timeout", 10),
+                **kwargs
+            )
 
 
 # =============================================================================
@@ -240,9 +294,17 @@ USER_KEYS = {
 }
 
 
+# One client per (base_url, api_key), so callers share its nonce ordering
+_TEST_CLIENTS: Dict[Tuple[str, str], ApiClient] = {}
+_TEST_CLIENTS_LOCK = threading.Lock()
+
+
 def get_test_client(base_url: str = None, user_id: int = 1) -> ApiClient:
     """
-    Get an API client configured with test credentials.
+    Get the shared API client configured with test credentials.
+    
+    Repeated calls for the same key return the same instance, as
+    ApiClient requires (see its thread-safety note).
     
     Args:
         base_url: Optional base URL override
@@ -253,11 +315,17 @@ def get_test_client(base_url: str = None, user_id: int = 1) -> ApiClient:
     """
     api_key, private_key = USER_KEYS.get(user_id, (TEST_API_KEY, TEST_PRIVATE_KEY_HEX))
     
-    return ApiClient(
-        api_key=api_key,
-        private_key_hex=private_key,
-        base_url=base_url
-    )
+    # Key on the URL the client will use, so None and the default share one
+    key = (base_url or ApiClient.DEFAULT_BASE_URL, api_key)
+    with _TEST_CLIENTS_LOCK:
+        client = _TEST_CLIENTS.get(key)
+        if client is None:
+            client = _TEST_CLIENTS[key] = ApiClient(
+                api_key=api_key,
+                private_key_hex=private_key,
+                base_url=base_url
+            )
+        return client
 
 
 # =============================================================================
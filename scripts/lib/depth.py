@@ -0,0 +1,66 @@
+"""
+Depth Cache for E2E Tests
+
+Test threads polling the same book share one depth fetch per TTL, and a
+request that changes the book drops the cache. Each invalidation bumps a
+generation counter; a fetch that was in flight across an invalidation may
+have read the book from before the change, so its result is returned to its
+caller but never stored.
+
+Usage:
+    from lib.depth import DepthCache
+
+    _DEPTH = DepthCache(fetch_order_book)
+
+    def get_order_book(symbol):
+        return _DEPTH.get(symbol) or {}
+
+    def invalidate_depth_cache():
+        _DEPTH.invalidate()
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Generic, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+DEPTH_CACHE_TTL = 0.05
+
+
+class DepthCache(Generic[T]):
+    """Per-symbol depth responses, reused for ttl seconds"""
+
+    def __init__(self, fetch: Callable[[str], Optional[T]], ttl: float = DEPTH_CACHE_TTL):
+        """
+        Args:
+            fetch: Reads depth for a symbol, returning None on failure
+            ttl: Seconds a stored response is reused
+        """
+        self._fetch = fetch
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._entries: Dict[str, Tuple[float, T]] = {}
+
+    def get(self, symbol: str) -> Optional[T]:
+        """Cached depth younger than ttl, otherwise a fresh fetch (None on failure)"""
+        with self._lock:
+            cached = self._entries.get(symbol)
+            generation = self._generation
+        if cached and time.monotonic() - cached[0] < self._ttl:
+            return cached[1]
+
+        fetched_at = time.monotonic()
+        depth = self._fetch(symbol)
+        if depth is not None:
+            with self._lock:
+                if self._generation == generation:
+                    self._entries[symbol] = (fetched_at, depth)
+        return depth
+
+    def invalidate(self):
+        """Drop cached depth after a request that changes the book"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
@@ -0,0 +1,56 @@
+"""
+Gateway Health Check for E2E Tests
+
+run_all_qa_tests.py runs every QA module's main() in one interpreter, and
+each main() starts by probing exchange_info. A successful probe is cached
+here for a short TTL so only the first module of a suite run pays for it.
+Failures are never cached, so a gateway that is still starting gets probed
+again by the next module.
+
+Usage:
+    from lib.health import check_gateway
+
+    error = check_gateway(GATEWAY_URL, SESSION)
+    if error:
+        print(f"❌ {error}")
+        return 1
+"""
+
+import time
+from typing import Dict, Optional
+
+import requests
+
+HEALTH_TTL = 30.0
+
+# gateway_url -> when it last answered the probe
+_HEALTHY_AT: Dict[str, float] = {}
+
+
+def check_gateway(gateway_url: str, session: Optional[requests.Session] = None,
+                  ttl: float = HEALTH_TTL) -> Optional[str]:
+    """
+    Probe exchange_info, unless it succeeded less than ttl seconds ago.
+
+    Args:
+        gateway_url: Gateway base URL
+        session: Session to probe with (plain requests.get if None)
+        ttl: Seconds a previous success stays valid
+
+    Returns:
+        None if the gateway is up, otherwise a short error message
+    """
+    healthy_at = _HEALTHY_AT.get(gateway_url)
+    if healthy_at is not None and time.monotonic() - healthy_at < ttl:
+        return None
+
+    get = session.get if session is not None else requests.get
+    try:
+        resp = get(f"{gateway_url}/api/v1/public/exchange_info", timeout=5)
+    except Exception as e:
+        return f"Cannot connect to Gateway: {e}"
+    if resp.status_code != 200:
+        return f"Gateway not responding: {resp.status_code}"
+
+    _HEALTHY_AT[gateway_url] = time.monotonic()
+    return None
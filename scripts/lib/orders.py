@@ -0,0 +1,85 @@
+"""
+Order Status Lookups for E2E Tests
+
+Shared by the QA suites that read back their own orders. The gateway has no
+multi-id lookup, so several orders are read with one /private/orders call
+(newest rows first) and only ids outside that window fall back to a
+per-order GET.
+
+Usage:
+    from lib.orders import get_order_statuses, wait_for_statuses
+
+    statuses = wait_for_statuses(client, {id_a: frozenset({"NEW"}),
+                                          id_b: frozenset({"FILLED"})})
+"""
+
+import time
+from typing import Dict, FrozenSet, List, Optional
+
+from .api_auth import ApiClient, parse_json
+from .polling import DEFAULT_INTERVAL
+
+# Order states that never change again
+TERMINAL_STATES: FrozenSet[str] = frozenset({"FILLED", "EXPIRED", "CANCELED", "REJECTED"})
+
+
+def get_order_status(client: ApiClient, order_id: int) -> Optional[str]:
+    """Get order status by ID"""
+    resp = client.get(f"/api/v1/private/order/{order_id}")
+    if resp.status_code == 200:
+        return parse_json(resp).get("data", {}).get("status")
+    return None
+
+
+def get_latest_orders(client: ApiClient, limit: int = 50) -> Dict[int, Dict]:
+    """
+    Get the newest state of each of the caller's recent orders, by order id.
+
+    /private/orders returns order rows newest first, possibly several per
+    order; the first row seen for an order is its current state.
+    """
+    latest: Dict[int, Dict] = {}
+    resp = client.get("/api/v1/private/orders", params={"limit": limit})
+    if resp.status_code == 200:
+        for order in parse_json(resp).get("data", []):
+            latest.setdefault(order.get("order_id"), order)
+    return latest
+
+
+def get_order_statuses(client: ApiClient, order_ids: List[int],
+                       limit: int = 50) -> Dict[int, Optional[str]]:
+    """Get the current status of several of the caller's orders in one read."""
+    latest = get_latest_orders(client, limit)
+    return {
+        order_id: latest[order_id].get("status") if order_id in latest
+        else get_order_status(client, order_id)
+        for order_id in order_ids
+    }
+
+
+def wait_for_statuses(client: ApiClient, desired: Dict[int, FrozenSet[str]],
+                      timeout: float = 3.0, initial_delay: float = DEFAULT_INTERVAL,
+                      max_delay: float = DEFAULT_INTERVAL) -> Dict[int, Optional[str]]:
+    """
+    Poll several orders until each is in its `desired` set (or terminal).
+
+    Args:
+        client: Client of the user owning every order in `desired`
+        desired: order_id -> states to wait for
+        timeout: Maximum seconds to wait
+        initial_delay: Seconds to sleep after the first miss
+        max_delay: Cap for the sleep, which grows 1.5x per miss
+
+    Returns:
+        The last statuses seen, by order id
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while time.monotonic() < deadline:
+        statuses = get_order_statuses(client, list(desired))
+        if all(statuses[order_id] in want or statuses[order_id] in TERMINAL_STATES
+               for order_id, want in desired.items()):
+            return statuses
+        time.sleep(delay)
+        delay = min(delay * 1.5, max_delay)
+    return get_order_statuses(client, list(desired))
@@ -0,0 +1,40 @@
+"""
+Polling Helpers for E2E Tests
+
+Replaces fixed time.sleep() waits with active polling, so a test only waits
+as long as the gateway actually needs instead of a worst-case budget.
+
+Usage:
+    from lib.polling import poll_until
+
+    in_book = poll_until(lambda: check_order_in_book(SYMBOL, "SELL", price),
+                         timeout=2.0)
+"""
+
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_INTERVAL = 0.02
+
+
+def poll_until(predicate: Callable[[], T], timeout: float = 3.0,
+               interval: float = DEFAULT_INTERVAL) -> T:
+    """
+    Call predicate until it returns a truthy value or timeout expires.
+
+    Args:
+        predicate: Zero-argument callable, evaluated at least once
+        timeout: Maximum seconds to wait
+        interval: Seconds to sleep between attempts
+
+    Returns:
+        The first truthy result, or the last (falsy) result on timeout
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        result = predicate()
+        if result or time.monotonic() >= deadline:
+            return result
+        time.sleep(interval)
@@ -20,11 +20,16 @@ Date: 2025-12-30
 
 import sys
 import os
-import subprocess
+import importlib.util
+import threading
 import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Seconds a module's main() may run before it is reported as a failure
+MODULE_TIMEOUT = 300
+
 # Test modules
 TEST_MODULES = [
     ("IOC Tests (P0)", "test_ioc_qa.py"),
@@ -48,27 +53,57 @@ def print_header():
     print()
 
 
-def run_test_module(name: str, script: str) -> tuple:
+def load_test_module(script: str):
+    """Import a test script as a module, without running its main()"""
+    module_name = os.path.splitext(script)[0]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, script))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def run_with_timeout(fn, timeout: float):
     """
-    Run a test module and return (passed, failed, skipped, errors)
+    Call fn on a daemon thread and return its result, waiting at most timeout
+    
+    Raises concurrent.futures.TimeoutError if fn is still running. A thread
+    cannot be killed, so a hung fn is abandoned; being a daemon, it does
+    not keep the process alive at exit.
+    """
+    future = Future()
+    
+    def target():
+        try:
+            future.set_result(fn())
+        except BaseException as e:  # re-raised in the caller, SystemExit included
+            future.set_exception(e)
+    
+    threading.Thread(target=target, daemon=True).start()
+    return future.result(timeout=timeout)
+
+
+def run_test_module(name: str, script: str) -> bool:
     """
-    script_path = os.path.join(SCRIPT_DIR, script)
+    Run a test module's main() in this interpreter; True if it passed
     
+    Modules share one interpreter, so requests, lib.api_auth and the
+    signing keys are imported once for the whole run. Raises
+    concurrent.futures.TimeoutError if main() outlives MODULE_TIMEOUT.
+    """
     print()
     print("-" * 80)
     print(f"📦 Running: {name}")
     print("-" * 80)
     
     try:
-        result = subprocess.run(
-            [sys.executable, script_path],
-            capture_output=False,
-            timeout=300
-        )
-        return result.returncode == 0
-    except subprocess.TimeoutExpired:
-        print(f"  ⚠️ TIMEOUT: {name}")
-        return False
+        return run_with_timeout(lambda: load_test_module(script).main(), MODULE_TIMEOUT) == 0
+    except SystemExit as e:
+        # Modules exit at import time when a dependency is missing
+        print(f"  ⚠️ EXIT: {name} (code={e.code})")
+        return e.code == 0
+    except FutureTimeout:
+        raise  # main() stops the run; not a plain module error
     except Exception as e:
         print(f"  ⚠️ ERROR: {e}")
         return False
@@ -79,10 +114,19 @@ def main():
     
     start_time = time.time()
     
+    # (name, passed), with passed None for a module that was never run
     results = []
-    for name, script in TEST_MODULES:
-        success = run_test_module(name, script)
-        results.append((name, success))
+    for i, (name, script) in enumerate(TEST_MODULES):
+        try:
+            results.append((name, run_test_module(name, script)))
+        except FutureTimeout:
+            # The hung module's thread can't be killed and would keep
+            # trading on the shared clients and book, so stop here rather
+            # than let it interfere with the next suite
+            print(f"  ⚠️ TIMEOUT: {name} (remaining modules skipped)")
+            results.append((name, False))
+            results.extend((rest, None) for rest, _ in TEST_MODULES[i + 1:])
+            break
     
     elapsed = time.time() - start_time
     
@@ -96,7 +140,10 @@ def main():
     failed_modules = 0
     
     for name, success in results:
-        if success:
+        if success is None:
+            print(f"  ⏭️ {name} (skipped)")
+            failed_modules += 1
+        elif success:
             print(f"  ✅ {name}")
             passed_modules += 1
         else:
@@ -37,7 +37,8 @@ except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, body_snippet, ApiClient
+from lib.health import check_gateway
 
 
 # =============================================================================
@@ -82,8 +83,8 @@ def place_order_raw(client: ApiClient, order_data: Dict) -> Tuple[int, Dict]:
     resp = client.post("/api/v1/private/order", order_data)
     try:
         data = resp.json()
-    except:
-        data = {"text": resp.text[:200]}
+    except ValueError:
+        data = {"text": body_snippet(resp)}
     return resp.status_code, data
 
 
@@ -103,7 +104,7 @@ def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
         order_id = data.get("data", {}).get("order_id")
         status = data.get("data", {}).get("order_status", "")
         return order_id, status, data
-    return None, None, {"error": resp.status_code, "text": resp.text[:200]}
+    return None, None, {"error": resp.status_code, "text": body_snippet(resp)}
 
 
 def cancel_order(client: ApiClient, order_id: int) -> bool:
@@ -115,7 +116,7 @@ def cleanup_order(client: ApiClient, order_id: Optional[int]):
     if order_id:
         try:
             cancel_order(client, order_id)
-        except:
+        except (requests.RequestException, ValueError):
             pass
 
 
@@ -685,13 +686,10 @@ def main():
     print(f"Gateway: {GATEWAY_URL}")
     print(f"Symbol: {SYMBOL}")
     
-    try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
-        if resp.status_code != 200:
-            print(f"\n❌ Gateway not responding: {resp.status_code}")
-            return 1
-    except Exception as e:
-        print(f"\n❌ Cannot connect to Gateway: {e}")
+    # Skipped when another module in this run probed within HEALTH_TTL
+    error = check_gateway(GATEWAY_URL)
+    if error:
+        print(f"\n❌ {error}")
         return 1
     
     print("\n✅ Gateway connected")
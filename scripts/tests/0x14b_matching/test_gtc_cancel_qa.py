@@ -44,7 +44,8 @@ except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, parse_json, body_snippet, ApiClient
+from lib.health import check_gateway
 
 
 # =============================================================================
@@ -56,6 +57,9 @@ SYMBOL = "BTC_USDT"
 USER_MAKER = 1001
 USER_TAKER = 1002
 
+# Shared LIMIT order fields; place_order() only fills in the per-call values
+_ORDER_TMPL = {"order_type": "LIMIT", "time_in_force": "GTC"}
+
 
 # =============================================================================
 # Test Result Types
@@ -84,36 +88,30 @@ class TestResult:
 
 def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
                 time_in_force: str = "GTC") -> Tuple[Optional[int], Optional[str], Dict]:
-    order_data = {
-        "symbol": symbol,
-        "side": side,
-        "order_type": "LIMIT",
-        "price": price,
-        "qty": qty,
-        "time_in_force": time_in_force,
-    }
+    order_data = {**_ORDER_TMPL, "symbol": symbol, "side": side,
+                  "price": price, "qty": qty, "time_in_force": time_in_force}
     resp = client.post("/api/v1/private/order", order_data)
     if resp.status_code in [200, 202]:
-        data = resp.json()
+        data = parse_json(resp)
         order_id = data.get("data", {}).get("order_id")
         status = data.get("data", {}).get("order_status", "")
         return order_id, status, data
-    return None, None, {"error": resp.status_code, "text": resp.text[:200]}
+    return None, None, {"error": resp.status_code, "text": body_snippet(resp)}
 
 
 def get_order_status(client: ApiClient, order_id: int) -> Optional[str]:
     resp = client.get(f"/api/v1/private/order/{order_id}")
     if resp.status_code == 200:
-        return resp.json().get("data", {}).get("status")
+        return parse_json(resp).get("data", {}).get("status")
     return None
 
 
 def cancel_order(client: ApiClient, order_id: int) -> Tuple[bool, Dict]:
     resp = client.delete(f"/api/v1/private/order/{order_id}")
     try:
-        data = resp.json()
-    except:
-        data = {"text": resp.text[:200]}
+        data = parse_json(resp)
+    except ValueError:  # JSONDecodeError (stdlib and orjson) subclasses ValueError
+        data = {"text": body_snippet(resp)}
     return resp.status_code in [200, 202], data
 
 
@@ -132,14 +130,14 @@ def cleanup_order(client: ApiClient, order_id: Optional[int]):
     if order_id:
         try:
             cancel_order(client, order_id)
-        except:
+        except requests.RequestException:
             pass
 
 
 def get_order_book(symbol: str) -> Dict:
     resp = requests.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
     if resp.status_code == 200:
-        return resp.json().get("data", {})
+        return parse_json(resp).get("data", {})
     return {}
 
 
@@ -670,13 +668,10 @@ def main():
     print(f"Gateway: {GATEWAY_URL}")
     print(f"Symbol: {SYMBOL}")
     
-    try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
-        if resp.status_code != 200:
-            print(f"\n❌ Gateway not responding: {resp.status_code}")
-            return 1
-    except Exception as e:
-        print(f"\n❌ Cannot connect to Gateway: {e}")
+    # Skipped when another module in this run probed within HEALTH_TTL
+    error = check_gateway(GATEWAY_URL)
+    if error:
+        print(f"\n❌ {error}")
         return 1
     
     print("\n✅ Gateway connected")
@@ -20,6 +20,7 @@ QA 0x14-b: IOC (Immediate-or-Cancel) 独立测试
 
 Usage:
     python3 scripts/tests/0x14b_matching/test_ioc_qa.py
+    IOC_VERBOSE=1 python3 scripts/tests/0x14b_matching/test_ioc_qa.py  # 打印每个用例的详细步骤
 
 Author: QA Engineer (Independent Design)
 Date: 2025-12-30
@@ -29,8 +30,13 @@ import sys
 import os
 import time
 import json
-from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+import threading
+from contextlib import contextmanager
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Optional, Dict, FrozenSet, Iterator, List, Tuple, Union
+from dataclasses import dataclass, field
 from enum import Enum
 
 # Add scripts directory to path
@@ -44,7 +50,9 @@ except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, parse_json, body_snippet, ApiClient
+from lib.polling import poll_until, DEFAULT_INTERVAL
+from lib.health import check_gateway
 
 
 # =============================================================================
@@ -58,6 +66,34 @@ SYMBOL = "BTC_USDT"
 USER_MAKER = 1001
 USER_TAKER = 1002
 
+# Prices and quantities, parsed once. Pass str(...) to the gateway and the
+# Decimal itself to book lookups, which are keyed by Decimal.
+QTY_FULL = Decimal("0.001")
+QTY_PARTIAL = Decimal("0.0006")
+QTY_IOC_004_L2 = Decimal("0.0005")
+
+PRICE_IOC_001 = Decimal("70000.00")
+PRICE_IOC_002 = Decimal("69000.00")
+PRICE_IOC_003 = Decimal("1000.00")
+PRICE_IOC_004_L1 = Decimal("68000.00")
+PRICE_IOC_004_L2 = Decimal("68100.00")
+PRICE_IOC_004 = Decimal("68200.00")
+PRICE_IOC_005_ASK = Decimal("67000.00")
+PRICE_IOC_005 = Decimal("65000.00")
+PRICE_IOC_006 = Decimal("66000.00")
+PRICE_IOC_007 = Decimal("65000.00")
+PRICE_IOC_008 = Decimal("71000.00")
+PRICE_IOC_009 = Decimal("72000.00")
+
+# Shared keep-alive session for public endpoints (depth, exchange_info)
+SESSION = requests.Session()
+
+# Per-test step traces are only kept with IOC_VERBOSE=1. Tests run on worker
+# threads, so each buffers its lines thread-locally and main() prints them
+# under the test's result line.
+VERBOSE = os.environ.get("IOC_VERBOSE", "0") == "1"
+_LOG = threading.local()
+
 
 # =============================================================================
 # Test Result Types
@@ -70,7 +106,34 @@ class TestStatus(Enum):
     ERROR = "ERROR"
 
 
-@dataclass
+class OrderState(Enum):
+    """Order status strings reported by GET /api/v1/private/order/{id}"""
+    NEW = "NEW"
+    ACCEPTED = "ACCEPTED"
+    PARTIALLY_FILLED = "PARTIALLY_FILLED"
+    FILLED = "FILLED"
+    CANCELED = "CANCELED"
+    REJECTED = "REJECTED"
+    EXPIRED = "EXPIRED"
+    UNKNOWN = "UNKNOWN"
+    
+    @classmethod
+    def parse(cls, status: Optional[str]) -> "OrderState":
+        try:
+            return cls(status)
+        except ValueError:
+            return cls.UNKNOWN
+
+
+TERMINAL_STATES = frozenset({
+    OrderState.FILLED, OrderState.EXPIRED, OrderState.CANCELED, OrderState.REJECTED,
+})
+# FILLED, or still queued in the async pipeline when we looked
+FILLED_OR_PENDING = frozenset({OrderState.FILLED, OrderState.ACCEPTED, OrderState.NEW})
+FILLED_OR_ACCEPTED = frozenset({OrderState.FILLED, OrderState.ACCEPTED})
+
+
+@dataclass(slots=True)
 class TestResult:
     test_id: str
     name: str
@@ -78,12 +141,27 @@ class TestResult:
     details: str = ""
     expected: str = ""
     actual: str = ""
+    log: List[str] = field(default_factory=list)
+    
+    # Summary icon per status (SKIP/ERROR share the warning icon)
+    _ICON = {
+        TestStatus.PASS: "✅",
+        TestStatus.FAIL: "❌",
+        TestStatus.SKIP: "⚠️",
+        TestStatus.ERROR: "⚠️",
+    }
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def log_debug(msg: str):
+    """Buffer a step trace line for the current test (no-op unless VERBOSE)"""
+    if VERBOSE:
+        _LOG.lines.append(msg)
+
+
 def place_order(
     client: ApiClient,
     symbol: str,
@@ -108,19 +186,19 @@ def place_order(
     resp = client.post("/api/v1/private/order", order_data)
     
     if resp.status_code in [200, 202]:
-        data = resp.json()
+        data = parse_json(resp)
         order_id = data.get("data", {}).get("order_id")
         status = data.get("data", {}).get("order_status", "")
         return order_id, status, data
     else:
-        return None, None, {"error": resp.status_code, "text": resp.text[:200]}
+        return None, None, {"error": resp.status_code, "text": body_snippet(resp)}
 
 
 def get_order_status(client: ApiClient, order_id: int) -> Optional[str]:
     """Get current order status"""
     resp = client.get(f"/api/v1/private/order/{order_id}")
     if resp.status_code == 200:
-        return resp.json().get("data", {}).get("status")
+        return parse_json(resp).get("data", {}).get("status")
     return None
 
 
@@ -128,7 +206,7 @@ def get_order_details(client: ApiClient, order_id: int) -> Optional[Dict]:
     """Get full order details"""
     resp = client.get(f"/api/v1/private/order/{order_id}")
     if resp.status_code == 200:
-        return resp.json().get("data", {})
+        return parse_json(resp).get("data", {})
     return None
 
 
@@ -136,18 +214,13 @@ def wait_for_order_terminal(client: ApiClient, order_id: int, timeout: float = 3
     """
     Wait for order to reach terminal state (FILLED, EXPIRED, CANCELED, REJECTED)
     """
-    terminal_states = {"FILLED", "EXPIRED", "CANCELED", "REJECTED"}
-    start = time.time()
+    deadline = time.monotonic() + timeout
     
-    while time.time() - start < timeout:
+    while time.monotonic() < deadline:
         status = get_order_status(client, order_id)
-        if status in terminal_states:
+        if OrderState.parse(status) in TERMINAL_STATES:
             return status
-        # Also check non-terminal states to return early for testing
-        if status in {"NEW", "ACCEPTED", "PARTIALLY_FILLED"}:
-            time.sleep(0.2)
-            continue
-        time.sleep(0.1)
+        time.sleep(DEFAULT_INTERVAL)
     
     return get_order_status(client, order_id)
 
@@ -158,15 +231,30 @@ def cancel_order(client: ApiClient, order_id: int) -> bool:
     return resp.status_code in [200, 202]
 
 
-def get_order_book(symbol: str) -> Dict:
+def get_order_book(symbol: str, limit: int = 50) -> Dict:
     """Get order book depth"""
-    resp = requests.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
+    resp = SESSION.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit={limit}", timeout=5)
     if resp.status_code == 200:
-        return resp.json().get("data", {})
+        return parse_json(resp).get("data", {})
     return {}
 
 
-def check_order_in_book(symbol: str, side: str, price: str) -> bool:
+def get_book_snapshot(symbol: str) -> Dict[str, Dict[Decimal, Decimal]]:
+    """
+    Fetch depth once as {"bids": {price: qty}, "asks": {price: qty}}
+    
+    Lets a test answer several check_order_in_book() queries against the
+    same book state with a single request.
+    """
+    depth = get_order_book(symbol, limit=100)
+    return {
+        side: {Decimal(p): Decimal(q) for p, q in depth.get(side, [])}
+        for side in ("bids", "asks")
+    }
+
+
+def check_order_in_book(symbol: str, side: str, price: Decimal,
+                        snapshot: Optional[Dict[str, Dict[Decimal, Decimal]]] = None) -> bool:
     """
     Check if an order at given price exists in order book
     
@@ -174,507 +262,236 @@ def check_order_in_book(symbol: str, side: str, price: str) -> bool:
         symbol: Trading pair
         side: "BUY" (check bids) or "SELL" (check asks)
         price: Price to check
+        snapshot: Book from get_book_snapshot(); fetched fresh if omitted
     
     Returns:
         True if order at that price exists in book
     """
-    depth = get_order_book(symbol)
-    
-    if side == "BUY":
-        levels = depth.get("bids", [])
-    else:
-        levels = depth.get("asks", [])
-    
-    target_price = float(price)
-    for level in levels:
-        if len(level) >= 1 and abs(float(level[0]) - target_price) < 0.01:
-            return True
-    return False
+    if snapshot is None:
+        snapshot = get_book_snapshot(symbol)
+    return price in snapshot["bids" if side == "BUY" else "asks"]
 
 
-def cleanup_order(client: ApiClient, order_id: Optional[int]):
-    """Best effort cleanup of an order"""
-    if order_id:
-        try:
-            cancel_order(client, order_id)
-        except:
-            pass
+def wait_for_order_in_book(symbol: str, side: str, price: Decimal, timeout: float = 2.0) -> bool:
+    """Poll depth until a level at the given price shows up on that side"""
+    return poll_until(lambda: check_order_in_book(symbol, side, price), timeout=timeout)
 
 
-# =============================================================================
-# IOC Test Cases
-# =============================================================================
-
-def test_ioc_001_full_match() -> TestResult:
-    """
-    IOC-001: IOC 完全成交
-    
-    前置条件: Ask 深度 = 100 @ 50000
-    操作: BUY IOC 100 @ 50000
-    预期: 成交100, 状态=FILLED, 订单簿无残留
-    """
-    test_id = "IOC-001"
-    test_name = "IOC 完全成交"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
-    client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    price = "70000.00"
-    qty = "0.001"
-    maker_order_id = None
-    ioc_order_id = None
-    
-    try:
-        # Step 1: Place maker SELL order (GTC)
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "SELL", price, qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR, 
-                            details="Failed to place maker order")
-        
-        print(f"  Maker order placed: {maker_order_id}")
-        time.sleep(0.5)  # Wait for order to be in book
-        
-        # Step 2: Place IOC BUY order (should fully match)
-        ioc_order_id, initial_status, resp = place_order(client_taker, SYMBOL, "BUY", price, qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC order placed: {ioc_order_id}, initial_status={initial_status}")
-        
-        # Step 3: Wait for terminal state
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        print(f"  IOC final status: {final_status}")
-        
-        # Step 4: Verify IOC is NOT in order book
-        ioc_in_book = check_order_in_book(SYMBOL, "BUY", price)
-        
-        # Verification
-        expected = "FILLED, not in book"
-        actual = f"status={final_status}, in_book={ioc_in_book}"
-        
-        if final_status == "FILLED" and not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        elif final_status in ["ACCEPTED", "NEW"] and not ioc_in_book:
-            # Async processing - may need more time
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            details="Order accepted (async), not in book",
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
+def get_trades(client: ApiClient, limit: int) -> List[Dict]:
+    """Get the caller's most recent trades"""
+    resp = client.get("/api/v1/private/trades", params={"limit": limit})
+    if resp.status_code == 200:
+        return parse_json(resp).get("data", [])
+    return []
 
 
-def test_ioc_002_partial_fill() -> TestResult:
+@contextmanager
+def resting_order(client: ApiClient, side: str, price: Decimal, qty: Decimal,
+                  teardown: Optional[List[Tuple[ApiClient, Optional[int]]]] = None
+                  ) -> Iterator[Optional[int]]:
     """
-    IOC-002: IOC 部分成交
+    Place a GTC maker order, wait until it rests in the book, cancel on exit
     
-    前置条件: Ask 深度 = 60 @ 50000
-    操作: BUY IOC 100 @ 50000
-    预期: 成交60, 剩余40过期, IOC 不入簿
-    
-    关键验证: IOC 剩余部分 **绝不** 入簿
+    Yields the order id, or None if placement failed. Orders the test
+    appends to `teardown` are cancelled in the same concurrent batch.
     """
-    test_id = "IOC-002"
-    test_name = "IOC 部分成交后不入簿"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
-    client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    price = "69000.00"
-    maker_qty = "0.0006"  # Smaller quantity
-    ioc_qty = "0.001"     # Larger quantity
-    maker_order_id = None
-    ioc_order_id = None
-    
+    order_id, _, _ = place_order(client, SYMBOL, side, str(price), str(qty), "GTC")
     try:
-        # Step 1: Place smaller maker order
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "SELL", price, maker_qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Maker order: {maker_order_id} (qty={maker_qty})")
-        time.sleep(0.5)
-        
-        # Step 2: Place larger IOC order
-        ioc_order_id, _, resp = place_order(client_taker, SYMBOL, "BUY", price, ioc_qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC order: {ioc_order_id} (qty={ioc_qty})")
-        
-        # Step 3: Wait for processing
-        time.sleep(1.0)
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        print(f"  IOC final status: {final_status}")
-        
-        # Step 4: KEY VERIFICATION - IOC must NOT be in book
-        ioc_in_book = check_order_in_book(SYMBOL, "BUY", price)
-        print(f"  IOC in book: {ioc_in_book}")
-        
-        # Verification
-        expected = "IOC not in book (remainder expired)"
-        actual = f"in_book={ioc_in_book}, status={final_status}"
-        
-        if not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details="CRITICAL: IOC remainder resting in book!",
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
+        if order_id:
+            wait_for_order_in_book(SYMBOL, side, price)
+        yield order_id
     finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
+        cleanup_orders([(client, order_id), *(teardown or [])])
 
 
-def test_ioc_003_no_match() -> TestResult:
+@contextmanager
+def resting_orders(client: ApiClient, side: str, levels: List[Tuple[Decimal, Decimal]],
+                   teardown: Optional[List[Tuple[ApiClient, Optional[int]]]] = None
+                   ) -> Iterator[List[Optional[int]]]:
     """
-    IOC-003: IOC 无对手盘
+    resting_order() for several (price, qty) levels, placed concurrently
     
-    前置条件: 订单簿空（或无交叉价格）
-    操作: BUY IOC 100 @ 低价
-    预期: 成交0, 全部过期, IOC 不入簿
+    Each worker places one level and waits for it in the book, so one
+    level's depth polling overlaps the next level's placement. Yields the
+    order ids in level order (None for any level that failed to place).
+    Every order that was placed is cancelled on exit, even if another
+    level's worker raised.
     """
-    test_id = "IOC-003"
-    test_name = "IOC 无对手盘不入簿"
-    
-    print(f"\n[{test_id}] {test_name}")
+    # Filled in by each worker as soon as its order is placed, so cleanup
+    # sees it even if the depth wait that follows raises
+    order_ids: List[Optional[int]] = [None] * len(levels)
     
-    client = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    # Use a very low price that won't match any asks
-    price = "1000.00"
-    qty = "0.001"
-    ioc_order_id = None
+    def place_and_wait(index: int, level: Tuple[Decimal, Decimal]):
+        price, qty = level
+        order_ids[index], _, _ = place_order(client, SYMBOL, side, str(price), str(qty), "GTC")
+        if order_ids[index]:
+            wait_for_order_in_book(SYMBOL, side, price)
     
     try:
-        # Place IOC at non-crossing price
-        ioc_order_id, initial_status, resp = place_order(client, SYMBOL, "BUY", price, qty, "IOC")
-        if not ioc_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC order: {ioc_order_id}, initial_status={initial_status}")
-        
-        # Wait for processing
-        time.sleep(0.5)
-        final_status = wait_for_order_terminal(client, ioc_order_id, timeout=3.0)
-        print(f"  IOC final status: {final_status}")
-        
-        # KEY VERIFICATION - IOC must NOT be in book
-        ioc_in_book = check_order_in_book(SYMBOL, "BUY", price)
-        print(f"  IOC in book: {ioc_in_book}")
-        
-        # Verification
-        expected = "IOC not in book (no match, expired)"
-        actual = f"in_book={ioc_in_book}, status={final_status}"
-        
-        if not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details="CRITICAL: IOC resting in book without match!",
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
+        with ThreadPoolExecutor(max_workers=max(len(levels), 1)) as ex:
+            futures = [ex.submit(place_and_wait, i, level) for i, level in enumerate(levels)]
+            for future in futures:
+                try:
+                    future.result()
+                except requests.RequestException:
+                    pass
+        yield order_ids
     finally:
-        cleanup_order(client, ioc_order_id)
+        cleanup_orders([(client, order_id) for order_id in order_ids] + (teardown or []))
 
 
-def test_ioc_004_cross_level_sweep() -> TestResult:
-    """
-    IOC-004: IOC 跨价位扫单
-    
-    前置条件: Ask: 60@50000, 50@50100
-    操作: BUY IOC 100 @ 50200
-    预期: 成交100(60+40), FILLED
-    """
-    test_id = "IOC-004"
-    test_name = "IOC 跨价位扫单"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
-    client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    price1 = "68000.00"
-    price2 = "68100.00"
-    ioc_price = "68200.00"
-    
-    qty1 = "0.0006"
-    qty2 = "0.0005"
-    ioc_qty = "0.001"  # Less than qty1 + qty2 to ensure full fill
-    
-    maker_id1 = None
-    maker_id2 = None
-    ioc_order_id = None
-    
-    try:
-        # Step 1: Place two maker orders at different prices
-        maker_id1, _, _ = place_order(client_maker, SYMBOL, "SELL", price1, qty1, "GTC")
-        maker_id2, _, _ = place_order(client_maker, SYMBOL, "SELL", price2, qty2, "GTC")
-        
-        if not maker_id1 or not maker_id2:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker orders")
-        
-        print(f"  Maker orders: {maker_id1}@{price1}, {maker_id2}@{price2}")
-        time.sleep(0.5)
-        
-        # Step 2: Place IOC to sweep both levels
-        ioc_order_id, _, resp = place_order(client_taker, SYMBOL, "BUY", ioc_price, ioc_qty, "IOC")
-        if not ioc_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC order: {ioc_order_id} (qty={ioc_qty})")
-        
-        # Step 3: Wait and verify
-        time.sleep(1.0)
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        print(f"  IOC final status: {final_status}")
-        
-        # IOC should not be in book
-        ioc_in_book = check_order_in_book(SYMBOL, "BUY", ioc_price)
-        
-        expected = "FILLED after sweeping multiple levels"
-        actual = f"status={final_status}, in_book={ioc_in_book}"
-        
-        if final_status in ["FILLED", "ACCEPTED"] and not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_id1)
-        cleanup_order(client_maker, maker_id2)
-        cleanup_order(client_taker, ioc_order_id)
+def find_trades_for_order(client: ApiClient, order_id: int, limit: int = 10) -> List[Dict]:
+    """Get the caller's recent trades that belong to the given order"""
+    return [t for t in get_trades(client, limit) if t.get("order_id") == order_id]
 
 
-def test_ioc_005_unfavorable_price() -> TestResult:
-    """
-    IOC-005: IOC 价格不利无成交
-    
-    前置条件: Ask 最优 = 50000
-    操作: BUY IOC 100 @ 48000 (低于最优ask)
-    预期: 成交0, 过期, 不入簿
-    """
-    test_id = "IOC-005"
-    test_name = "IOC 价格不利无成交"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
-    client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    ask_price = "67000.00"
-    ioc_price = "65000.00"  # Below ask - won't cross
-    qty = "0.001"
-    
-    maker_order_id = None
-    ioc_order_id = None
-    
-    try:
-        # Place ask at higher price
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "SELL", ask_price, qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Ask order at {ask_price}")
-        time.sleep(0.5)
-        
-        # Place IOC at lower price (won't cross)
-        ioc_order_id, _, resp = place_order(client_taker, SYMBOL, "BUY", ioc_price, qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC BUY at {ioc_price} (below ask)")
-        
-        time.sleep(0.5)
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        ioc_in_book = check_order_in_book(SYMBOL, "BUY", ioc_price)
-        
-        print(f"  IOC status: {final_status}, in_book: {ioc_in_book}")
-        
-        expected = "No match, expired, not in book"
-        actual = f"status={final_status}, in_book={ioc_in_book}"
-        
-        if not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details="IOC at non-crossing price resting in book!",
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
+def cleanup_order(client: ApiClient, order_id: Optional[int]):
+    """Best effort cleanup of an order"""
+    if order_id:
+        try:
+            cancel_order(client, order_id)
+        except (requests.RequestException, ValueError):
+            pass
 
 
-def test_ioc_006_sell_full_match() -> TestResult:
+def cleanup_orders(orders: List[Tuple[ApiClient, Optional[int]]]):
     """
-    IOC-006: IOC SELL 完全成交
+    Best effort cleanup of several orders, issued concurrently
     
-    前置条件: Bid 深度 = 100 @ 50000
-    操作: SELL IOC 100 @ 50000
-    预期: 成交100, FILLED
+    The gateway has no bulk cancel endpoint, so this fans the per-order
+    DELETEs out over a small pool. Requests on the same client are still
+    serialized by ApiClient to keep ts_nonce ordered.
     """
-    test_id = "IOC-006"
-    test_name = "IOC SELL 完全成交"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
-    client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
-    
-    price = "66000.00"
-    qty = "0.001"
-    maker_order_id = None
-    ioc_order_id = None
-    
-    try:
-        # Place BID (maker wants to buy)
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "BUY", price, qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Bid order at {price}")
-        time.sleep(0.5)
-        
-        # Place IOC SELL
-        ioc_order_id, _, resp = place_order(client_taker, SYMBOL, "SELL", price, qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC SELL at {price}")
-        
-        time.sleep(0.5)
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        ioc_in_book = check_order_in_book(SYMBOL, "SELL", price)
-        
-        print(f"  IOC status: {final_status}, in_book: {ioc_in_book}")
-        
-        expected = "FILLED, not in book"
-        actual = f"status={final_status}, in_book={ioc_in_book}"
-        
-        if final_status in ["FILLED", "ACCEPTED"] and not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
+    orders = [(client, order_id) for client, order_id in orders if order_id]
+    if len(orders) <= 1:
+        for client, order_id in orders:
+            cleanup_order(client, order_id)
+        return
+    with ThreadPoolExecutor(max_workers=len(orders)) as ex:
+        list(ex.map(lambda o: cleanup_order(*o), orders))
 
 
-def test_ioc_007_sell_partial_fill() -> TestResult:
+# =============================================================================
+# IOC Test Cases
+# =============================================================================
+
+@dataclass(frozen=True)
+class IocCase:
     """
-    IOC-007: IOC SELL 部分成交
+    One maker-then-IOC scenario
     
-    前置条件: Bid 深度 = 60 @ 50000
-    操作: SELL IOC 100 @ 50000
-    预期: 成交60, 剩余40过期, 不入簿
+    Makers rest on the side opposite the IOC. The case passes when the IOC
+    is not in the book afterwards and, if pass_states is set, its final
+    status is one of those states.
     """
-    test_id = "IOC-007"
-    test_name = "IOC SELL 部分成交不入簿"
-    
-    print(f"\n[{test_id}] {test_name}")
+    test_id: str
+    name: str
+    ioc_side: str
+    ioc_price: Decimal
+    ioc_qty: Decimal
+    makers: Tuple[Tuple[Decimal, Decimal], ...] = ()  # (price, qty) levels
+    pass_states: Optional[FrozenSet[OrderState]] = None
+    expected: str = "IOC not in book"
+    fail_details: str = ""
+
+
+IOC_CASES = [
+    # 前置: Ask 100 @ P; 操作: BUY IOC 100 @ P; 预期: FILLED, 订单簿无残留
+    IocCase("IOC-001", "IOC 完全成交", "BUY", PRICE_IOC_001, QTY_FULL,
+            makers=((PRICE_IOC_001, QTY_FULL),),
+            pass_states=FILLED_OR_PENDING,
+            expected="FILLED, not in book"),
+    # 前置: Ask 60 @ P; 操作: BUY IOC 100 @ P; 预期: 成交60, 剩余40过期, **绝不** 入簿
+    IocCase("IOC-002", "IOC 部分成交后不入簿", "BUY", PRICE_IOC_002, QTY_FULL,
+            makers=((PRICE_IOC_002, QTY_PARTIAL),),
+            expected="IOC not in book (remainder expired)",
+            fail_details="CRITICAL: IOC remainder resting in book!"),
+    # 前置: 无交叉价格; 操作: BUY IOC @ 低价; 预期: 成交0, 全部过期, 不入簿
+    IocCase("IOC-003", "IOC 无对手盘不入簿", "BUY", PRICE_IOC_003, QTY_FULL,
+            expected="IOC not in book (no match, expired)",
+            fail_details="CRITICAL: IOC resting in book without match!"),
+    # 前置: Ask 60 @ P1, 50 @ P2; 操作: BUY IOC 100 @ P3; 预期: 成交100(60+40), FILLED
+    IocCase("IOC-004", "IOC 跨价位扫单", "BUY", PRICE_IOC_004, QTY_FULL,
+            makers=((PRICE_IOC_004_L1, QTY_PARTIAL), (PRICE_IOC_004_L2, QTY_IOC_004_L2)),
+            pass_states=FILLED_OR_ACCEPTED,
+            expected="FILLED after sweeping multiple levels"),
+    # 前置: Ask 最优 = P; 操作: BUY IOC @ 低于P; 预期: 成交0, 过期, 不入簿
+    IocCase("IOC-005", "IOC 价格不利无成交", "BUY", PRICE_IOC_005, QTY_FULL,
+            makers=((PRICE_IOC_005_ASK, QTY_FULL),),
+            expected="No match, expired, not in book",
+            fail_details="IOC at non-crossing price resting in book!"),
+    # 前置: Bid 100 @ P; 操作: SELL IOC 100 @ P; 预期: FILLED
+    IocCase("IOC-006", "IOC SELL 完全成交", "SELL", PRICE_IOC_006, QTY_FULL,
+            makers=((PRICE_IOC_006, QTY_FULL),),
+            pass_states=FILLED_OR_ACCEPTED,
+            expected="FILLED, not in book"),
+    # 前置: Bid 60 @ P; 操作: SELL IOC 100 @ P; 预期: 成交60, 剩余40过期, 不入簿
+    IocCase("IOC-007", "IOC SELL 部分成交不入簿", "SELL", PRICE_IOC_007, QTY_FULL,
+            makers=((PRICE_IOC_007, QTY_PARTIAL),),
+            expected="IOC not in book after partial fill",
+            fail_details="CRITICAL: IOC SELL remainder in book!"),
+]
+IOC_CASES_BY_ID = {case.test_id: case for case in IOC_CASES}
+
+
+def run_ioc_case(case: IocCase) -> TestResult:
+    """Place the case's makers, send the IOC, and verify it never rests"""
+    test_id, test_name = case.test_id, case.name
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
+    maker_side = "SELL" if case.ioc_side == "BUY" else "BUY"
     
-    price = "65000.00"
-    maker_qty = "0.0006"
-    ioc_qty = "0.001"
-    maker_order_id = None
-    ioc_order_id = None
+    teardown: List[Tuple[ApiClient, Optional[int]]] = []
     
     try:
-        # Place smaller BID
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "BUY", price, maker_qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Bid order: {maker_order_id} (qty={maker_qty})")
-        time.sleep(0.5)
-        
-        # Place larger IOC SELL
-        ioc_order_id, _, resp = place_order(client_taker, SYMBOL, "SELL", price, ioc_qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details=f"Failed to place IOC order: {resp}")
-        
-        print(f"  IOC SELL: {ioc_order_id} (qty={ioc_qty})")
-        
-        time.sleep(1.0)
-        final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
-        ioc_in_book = check_order_in_book(SYMBOL, "SELL", price)
-        
-        print(f"  IOC status: {final_status}, in_book: {ioc_in_book}")
-        
-        expected = "IOC not in book after partial fill"
-        actual = f"status={final_status}, in_book={ioc_in_book}"
-        
-        if not ioc_in_book:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details="CRITICAL: IOC SELL remainder in book!",
-                            expected=expected, actual=actual)
+        # Step 1: Place maker orders (GTC) on the opposite side
+        with resting_orders(client_maker, maker_side, list(case.makers), teardown) as maker_ids:
+            if not all(maker_ids):
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to place maker orders")
+            
+            for order_id, (price, qty) in zip(maker_ids, case.makers):
+                log_debug(f"Maker {maker_side}: {order_id} @ {price} (qty={qty})")
+            
+            # Step 2: Place IOC order
+            ioc_order_id, initial_status, resp = place_order(
+                client_taker, SYMBOL, case.ioc_side, str(case.ioc_price), str(case.ioc_qty), "IOC")
+            teardown.append((client_taker, ioc_order_id))
+            if not ioc_order_id:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details=f"Failed to place IOC order: {resp}")
+            
+            log_debug(f"IOC {case.ioc_side}: {ioc_order_id} @ {case.ioc_price} "
+                      f"(qty={case.ioc_qty}), initial_status={initial_status}")
+            
+            # Step 3: Wait for terminal state
+            final_status = wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
+            log_debug(f"IOC final status: {final_status}")
+            
+            # Step 4: KEY VERIFICATION - IOC must NOT be in book
+            snap = get_book_snapshot(SYMBOL)
+            ioc_in_book = check_order_in_book(SYMBOL, case.ioc_side, case.ioc_price, snap)
+            log_debug(f"IOC in book: {ioc_in_book}")
+            for price, _ in case.makers:
+                log_debug(f"Maker level {price} in book: "
+                          f"{check_order_in_book(SYMBOL, maker_side, price, snap)}")
+            
+            # Verification
+            expected = case.expected
+            actual = f"status={final_status}, in_book={ioc_in_book}"
+            
+            status_ok = case.pass_states is None or OrderState.parse(final_status) in case.pass_states
+            if status_ok and not ioc_in_book:
+                return TestResult(test_id, test_name, TestStatus.PASS,
+                                expected=expected, actual=actual)
+            else:
+                return TestResult(test_id, test_name, TestStatus.FAIL,
+                                details=case.fail_details,
+                                expected=expected, actual=actual)
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
 
 
 # =============================================================================
@@ -694,74 +511,66 @@ def test_ioc_008_verify_filled_qty() -> TestResult:
     test_id = "IOC-008"
     test_name = "IOC 成交数量验证"
     
-    print(f"\n[{test_id}] {test_name}")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "71000.00"
-    maker_qty = "0.0006"  # 精确的 maker 数量
-    ioc_qty = "0.001"     # IOC 想买更多
-    expected_filled = 0.0006  # 应该成交 maker 的全部数量
+    price = PRICE_IOC_008
+    maker_qty = QTY_PARTIAL  # 精确的 maker 数量
+    ioc_qty = QTY_FULL       # IOC 想买更多
+    expected_filled = maker_qty  # 应该成交 maker 的全部数量
     
-    maker_order_id = None
-    ioc_order_id = None
+    teardown: List[Tuple[ApiClient, Optional[int]]] = []
     
     try:
         # Place maker SELL order
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "SELL", price, maker_qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Maker: {maker_order_id} (qty={maker_qty})")
-        time.sleep(0.5)
-        
-        # Place IOC BUY order
-        ioc_order_id, _, _ = place_order(client_taker, SYMBOL, "BUY", price, ioc_qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place IOC order")
-        
-        print(f"  IOC: {ioc_order_id} (qty={ioc_qty})")
-        time.sleep(1.0)
-        
-        # Get order details to verify filled_qty
-        order_details = get_order_details(client_taker, ioc_order_id)
-        
-        if not order_details:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to get order details")
-        
-        # Extract filled quantity
-        filled_qty_str = order_details.get("filled_qty", order_details.get("executed_qty", "0"))
-        try:
-            filled_qty = float(filled_qty_str)
-        except:
-            filled_qty = 0.0
-        
-        status = order_details.get("status", "UNKNOWN")
-        print(f"  Order details: status={status}, filled_qty={filled_qty}")
-        
-        expected = f"filled_qty={expected_filled}"
-        actual = f"filled_qty={filled_qty}, status={status}"
+        with resting_order(client_maker, "SELL", price, maker_qty, teardown) as maker_order_id:
+            if not maker_order_id:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to place maker order")
+            
+            log_debug(f"Maker: {maker_order_id} (qty={maker_qty})")
+            
+            # Place IOC BUY order
+            ioc_order_id, _, _ = place_order(client_taker, SYMBOL, "BUY", str(price), str(ioc_qty), "IOC")
+            teardown.append((client_taker, ioc_order_id))
+            if not ioc_order_id:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to place IOC order")
+            
+            log_debug(f"IOC: {ioc_order_id} (qty={ioc_qty})")
+            wait_for_order_terminal(client_taker, ioc_order_id, timeout=3.0)
+            
+            # Get order details to verify filled_qty
+            order_details = get_order_details(client_taker, ioc_order_id)
+            
+            if not order_details:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to get order details")
+            
+            # Extract filled quantity
+            filled_qty_str = order_details.get("filled_qty", order_details.get("executed_qty", "0"))
+            try:
+                filled_qty = Decimal(filled_qty_str or "0")
+            except (InvalidOperation, TypeError):
+                filled_qty = Decimal(0)
+            
+            status = order_details.get("status", "UNKNOWN")
+            log_debug(f"Order details: status={status}, filled_qty={filled_qty}")
+            
+            expected = f"filled_qty={expected_filled}"
+            actual = f"filled_qty={filled_qty}, status={status}"
+            
+            # Verify filled quantity matches expected exactly
+            if filled_qty == expected_filled:
+                return TestResult(test_id, test_name, TestStatus.PASS,
+                                expected=expected, actual=actual)
+            else:
+                return TestResult(test_id, test_name, TestStatus.FAIL,
+                                details=f"Filled qty mismatch",
+                                expected=expected, actual=actual)
         
-        # Verify filled quantity matches expected (with small tolerance for float)
-        if abs(filled_qty - expected_filled) < 0.00001:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details=f"Filled qty mismatch",
-                            expected=expected, actual=actual)
-    
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
 
 
 def test_ioc_009_verify_trade_record() -> TestResult:
@@ -777,88 +586,96 @@ def test_ioc_009_verify_trade_record() -> TestResult:
     test_id = "IOC-009"
     test_name = "IOC Trade 记录验证"
     
-    print(f"\n[{test_id}] {test_name}")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "72000.00"
-    qty = "0.001"
+    price = PRICE_IOC_009
+    qty = QTY_FULL
     
-    maker_order_id = None
-    ioc_order_id = None
+    teardown: List[Tuple[ApiClient, Optional[int]]] = []
     
     try:
-        # Get trades before
-        resp_before = client_taker.get("/api/v1/private/trades", params={"limit": 5})
-        trades_before = []
-        if resp_before.status_code == 200:
-            trades_before = resp_before.json().get("data", [])
-        trades_count_before = len(trades_before)
-        
-        print(f"  Trades before: {trades_count_before}")
-        
         # Place maker SELL order
-        maker_order_id, _, _ = place_order(client_maker, SYMBOL, "SELL", price, qty, "GTC")
-        if not maker_order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place maker order")
-        
-        print(f"  Maker: {maker_order_id}")
-        time.sleep(0.5)
-        
-        # Place IOC BUY order (should match)
-        ioc_order_id, _, _ = place_order(client_taker, SYMBOL, "BUY", price, qty, "IOC")
-        if not ioc_order_id:
-            cleanup_order(client_maker, maker_order_id)
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place IOC order")
-        
-        print(f"  IOC: {ioc_order_id}")
-        time.sleep(1.5)  # Allow trade to be recorded
-        
-        # Get trades after
-        resp_after = client_taker.get("/api/v1/private/trades", params={"limit": 10})
-        trades_after = []
-        if resp_after.status_code == 200:
-            trades_after = resp_after.json().get("data", [])
-        trades_count_after = len(trades_after)
-        
-        print(f"  Trades after: {trades_count_after}")
-        
-        # Verify new trade record exists
-        new_trades = trades_count_after - trades_count_before
-        
-        expected = "At least 1 new trade record"
-        actual = f"new_trades={new_trades}"
-        
-        if new_trades >= 1:
-            # Verify trade details if available
-            if trades_after:
-                latest_trade = trades_after[0]
-                trade_price = latest_trade.get("price", "")
-                trade_qty = latest_trade.get("qty", latest_trade.get("quantity", ""))
-                print(f"  Latest trade: price={trade_price}, qty={trade_qty}")
+        with resting_order(client_maker, "SELL", price, qty, teardown) as maker_order_id:
+            if not maker_order_id:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to place maker order")
             
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            details="No new trade record after IOC match",
-                            expected=expected, actual=actual)
-    
+            log_debug(f"Maker: {maker_order_id}")
+            
+            # Place IOC BUY order (should match)
+            ioc_order_id, _, _ = place_order(client_taker, SYMBOL, "BUY", str(price), str(qty), "IOC")
+            teardown.append((client_taker, ioc_order_id))
+            if not ioc_order_id:
+                return TestResult(test_id, test_name, TestStatus.ERROR,
+                                details="Failed to place IOC order")
+            
+            log_debug(f"IOC: {ioc_order_id}")
+            
+            # Poll until a trade for this IOC order is recorded
+            ioc_trades = poll_until(lambda: find_trades_for_order(client_taker, ioc_order_id),
+                                    timeout=3.0)
+            
+            log_debug(f"Trades for IOC: {len(ioc_trades)}")
+            
+            expected = "At least 1 trade record for the IOC order"
+            actual = f"ioc_trades={len(ioc_trades)}"
+            
+            if ioc_trades:
+                trade = ioc_trades[0]
+                trade_price = trade.get("price", "")
+                trade_qty = trade.get("qty", trade.get("quantity", ""))
+                log_debug(f"IOC trade: price={trade_price}, qty={trade_qty}")
+                
+                return TestResult(test_id, test_name, TestStatus.PASS,
+                                expected=expected, actual=actual)
+            else:
+                return TestResult(test_id, test_name, TestStatus.FAIL,
+                                details="No trade record for IOC order after match",
+                                expected=expected, actual=actual)
+        
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, maker_order_id)
-        cleanup_order(client_taker, ioc_order_id)
 
 
 # =============================================================================
 # Main Entry Point
 # =============================================================================
 
+# Tests in the same wave run on concurrent threads; signed requests on the
+# same user still go out one at a time (see ApiClient), so what overlaps is
+# the maker's and taker's traffic, depth polling and waits. An IOC BUY sweeps
+# every ask at or below its limit (and an IOC SELL every bid at or above it),
+# so tests whose price ranges could cross are kept in separate waves.
+TEST_WAVES = [
+    [IOC_CASES_BY_ID[i] for i in ("IOC-001", "IOC-003", "IOC-006")],
+    [IOC_CASES_BY_ID[i] for i in ("IOC-002", "IOC-007")],
+    [IOC_CASES_BY_ID["IOC-004"]],
+    [IOC_CASES_BY_ID["IOC-005"]],
+    # 流程专家审核补充
+    [test_ioc_008_verify_filled_qty],
+    [test_ioc_009_verify_trade_record],
+]
+
+
+def run_test(test: Union[IocCase, Callable[[], TestResult]]) -> TestResult:
+    _LOG.lines = []
+    try:
+        if isinstance(test, IocCase):
+            result = run_ioc_case(test)
+        else:
+            result = test()
+    except Exception as e:
+        result = TestResult(
+            test_id="UNKNOWN",
+            name=test.name if isinstance(test, IocCase) else test.__name__,
+            status=TestStatus.ERROR,
+            details=str(e)
+        )
+    result.log = _LOG.lines
+    return result
+
+
 def print_separator():
     print("=" * 70)
 
@@ -872,45 +689,27 @@ def main():
     print(f"Maker User: {USER_MAKER}")
     print(f"Taker User: {USER_TAKER}")
     
-    # Check gateway connectivity
-    try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
-        if resp.status_code != 200:
-            print(f"\n❌ Gateway not responding: {resp.status_code}")
-            return 1
-    except Exception as e:
-        print(f"\n❌ Cannot connect to Gateway: {e}")
+    # Check gateway connectivity (cached across modules in one run)
+    error = check_gateway(GATEWAY_URL, SESSION)
+    if error:
+        print(f"\n❌ {error}")
         print("  Ensure Gateway is running: cargo run --release --bin gateway")
         return 1
     
     print("\n✅ Gateway connected")
     
-    # Run all IOC tests
-    tests = [
-        test_ioc_001_full_match,
-        test_ioc_002_partial_fill,
-        test_ioc_003_no_match,
-        test_ioc_004_cross_level_sweep,
-        test_ioc_005_unfavorable_price,
-        test_ioc_006_sell_full_match,
-        test_ioc_007_sell_partial_fill,
-        # 流程专家审核补充
-        test_ioc_008_verify_filled_qty,
-        test_ioc_009_verify_trade_record,
-    ]
-    
-    results: List[TestResult] = []
-    for test_fn in tests:
-        try:
-            result = test_fn()
-            results.append(result)
-        except Exception as e:
-            results.append(TestResult(
-                test_id="UNKNOWN",
-                name=test_fn.__name__,
-                status=TestStatus.ERROR,
-                details=str(e)
-            ))
+    # Run all IOC tests, one wave at a time; report each result as it lands
+    counts = Counter()
+    failures: List[TestResult] = []
+    with ThreadPoolExecutor(max_workers=max(len(w) for w in TEST_WAVES)) as ex:
+        for wave in TEST_WAVES:
+            for r in ex.map(run_test, wave):
+                counts[r.status] += 1
+                print(f"  {TestResult._ICON[r.status]} [{r.test_id}] {r.name}: {r.status.value}")
+                for line in r.log:
+                    print(f"       {line}")
+                if r.status != TestStatus.PASS:
+                    failures.append(r)
     
     # Print summary
     print("\n")
@@ -918,32 +717,22 @@ def main():
     print("📊 IOC TEST RESULTS")
     print_separator()
     
-    passed = 0
-    failed = 0
-    errors = 0
-    
-    for r in results:
-        if r.status == TestStatus.PASS:
-            icon = "✅"
-            passed += 1
-        elif r.status == TestStatus.FAIL:
-            icon = "❌"
-            failed += 1
-        else:
-            icon = "⚠️"
-            errors += 1
-        
-        print(f"  {icon} [{r.test_id}] {r.name}: {r.status.value}")
-        if r.status != TestStatus.PASS:
-            if r.expected:
-                print(f"       Expected: {r.expected}")
-            if r.actual:
-                print(f"       Actual:   {r.actual}")
-            if r.details:
-                print(f"       Details:  {r.details}")
+    for r in failures:
+        print(f"  {TestResult._ICON[r.status]} [{r.test_id}] {r.name}: {r.status.value}")
+        if r.expected:
+            print(f"       Expected: {r.expected}")
+        if r.actual:
+            print(f"       Actual:   {r.actual}")
+        if r.details:
+            print(f"       Details:  {r.details}")
+    
+    total = sum(counts.values())
+    passed = counts[TestStatus.PASS]
+    failed = counts[TestStatus.FAIL]
+    errors = total - passed - failed
     
     print_separator()
-    print(f"Summary: {passed} PASS, {failed} FAIL, {errors} ERROR (Total: {len(results)})")
+    print(f"Summary: {passed} PASS, {failed} FAIL, {errors} ERROR (Total: {total})")
     
     if failed > 0 or errors > 0:
         print("\n⚠️  IOC Test Suite: FAILURES DETECTED")
@@ -28,8 +28,12 @@ Date: 2025-12-30
 import sys
 import os
 import time
-from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Callable, Optional, Dict, FrozenSet, List, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -38,11 +42,16 @@ sys.path.insert(0, SCRIPTS_ROOT)
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, parse_json, body_snippet, ApiClient
+from lib.polling import poll_until, DEFAULT_INTERVAL
+from lib.health import check_gateway
+from lib.depth import DepthCache
+from lib.orders import TERMINAL_STATES, get_order_status, get_latest_orders, wait_for_statuses
 
 
 # =============================================================================
@@ -54,6 +63,44 @@ SYMBOL = "BTC_USDT"
 USER_MAKER = 1001
 USER_TAKER = 1002
 
+# Prices and quantities, parsed once. REST bodies get str(...), which keeps
+# the two-decimal form written here; book lookups compare the Decimal itself.
+QTY = Decimal("0.001")
+QTY_MOV_001 = Decimal("0.01")
+
+PRICE_MOV_001_A = Decimal("59000.00")
+PRICE_MOV_001_B = Decimal("60000.00")
+PRICE_MOV_002_BID = Decimal("58000.00")
+PRICE_MOV_002_ASK = Decimal("58500.00")
+PRICE_MOV_002_MOVE = Decimal("59000.00")  # Would cross the ask if matching was triggered
+PRICE_MOV_003 = Decimal("57000.00")
+PRICE_MOV_004 = Decimal("50000.00")
+PRICE_MOV_005 = Decimal("56000.00")
+PRICE_MOV_005_MOVE = Decimal("55000.00")
+PRICE_MOV_006_OLD = Decimal("54000.00")
+PRICE_MOV_006_NEW = Decimal("55000.00")
+PRICE_MOV_007_OLD = Decimal("62000.00")
+PRICE_MOV_007_NEW = Decimal("61000.00")
+PRICE_PROBE = Decimal("1.00")
+
+# Shared keep-alive session for public endpoints (depth, exchange_info).
+# The gateway speaks HTTP/1.1 only, so pooled keep-alive is the transport
+# to tune here rather than HTTP/2 (see ApiClient's docstring).
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=ApiClient.POOL_CONNECTIONS,
+                                     pool_maxsize=ApiClient.POOL_MAXSIZE))
+
+# Order id that is never assigned; MOV-004 and the MoveOrder probe use it
+NONEXISTENT_ORDER_ID = 9999999999
+
+# GTC orders placed by the tests, cancelled in bulk by sweep_placed_orders()
+_PLACED_ORDERS: List[Tuple[ApiClient, int]] = []
+_PLACED_ORDERS_LOCK = threading.Lock()
+
+# Tests in a wave run on worker threads, so each buffers its output lines
+# thread-locally and main() prints them together once the test finishes.
+_LOG = threading.local()
+
 
 # =============================================================================
 # Test Result Types
@@ -66,7 +113,7 @@ class TestStatus(Enum):
     ERROR = "ERROR"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     test_id: str
     name: str
@@ -74,32 +121,45 @@ class TestResult:
     details: str = ""
     expected: str = ""
     actual: str = ""
+    log: List[str] = field(default_factory=list)
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
-def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
+def log(msg: str):
+    """Buffer an output line for the current test (printed directly outside run_test)"""
+    lines = getattr(_LOG, "lines", None)
+    if lines is None:
+        print(msg)
+    else:
+        lines.append(msg)
+
+
+def place_order(client: ApiClient, symbol: str, side: str, price: Decimal, qty: Decimal,
                 time_in_force: str = "GTC") -> Tuple[Optional[int], Optional[str], Dict]:
     order_data = {
         "symbol": symbol,
         "side": side,
         "order_type": "LIMIT",
-        "price": price,
-        "qty": qty,
+        "price": str(price),
+        "qty": str(qty),
         "time_in_force": time_in_force,
     }
     resp = client.post("/api/v1/private/order", order_data)
+    invalidate_depth_cache()
     if resp.status_code in [200, 202]:
-        data = resp.json()
+        data = parse_json(resp)
         order_id = data.get("data", {}).get("order_id")
         status = data.get("data", {}).get("order_status", "")
+        if order_id and time_in_force == "GTC":
+            track_order(client, order_id)
         return order_id, status, data
-    return None, None, {"error": resp.status_code, "text": resp.text[:200]}
+    return None, None, {"error": resp.status_code, "text": body_snippet(resp)}
 
 
-def move_order(client: ApiClient, order_id: int, new_price: str) -> Tuple[bool, Dict]:
+def move_order(client: ApiClient, order_id: int, new_price: Decimal) -> Tuple[bool, Dict]:
     """
     Move order to new price
     
@@ -107,64 +167,145 @@ def move_order(client: ApiClient, order_id: int, new_price: str) -> Tuple[bool,
     """
     data = {
         "order_id": order_id,
-        "new_price": new_price
+        "new_price": str(new_price)
     }
     resp = client.post("/api/v1/private/order/move", data)
+    invalidate_depth_cache()
     
     try:
-        resp_data = resp.json()
-    except:
-        resp_data = {"error": resp.text[:200]}
+        resp_data = parse_json(resp)
+    except ValueError:
+        resp_data = {"error": body_snippet(resp)}
     
     return resp.status_code in [200, 202], resp_data
 
 
-def get_order_status(client: ApiClient, order_id: int) -> Optional[str]:
-    resp = client.get(f"/api/v1/private/order/{order_id}")
-    if resp.status_code == 200:
-        return resp.json().get("data", {}).get("status")
-    return None
+def get_user_open_orders(client: ApiClient, limit: int = 50) -> List[Dict]:
+    """Get the caller's recent orders that are still resting in the book"""
+    return [o for o in get_latest_orders(client, limit).values()
+            if o.get("status") in ("NEW", "PARTIALLY_FILLED")]
 
 
 def cancel_order(client: ApiClient, order_id: int) -> bool:
     resp = client.delete(f"/api/v1/private/order/{order_id}")
+    invalidate_depth_cache()
     return resp.status_code in [200, 202]
 
 
-def wait_for_order_terminal(client: ApiClient, order_id: int, timeout: float = 3.0) -> Optional[str]:
-    terminal_states = {"FILLED", "EXPIRED", "CANCELED", "REJECTED"}
-    start = time.time()
-    while time.time() - start < timeout:
+def wait_for_status(client: ApiClient, order_id: int, desired: FrozenSet[str],
+                    timeout: float = 3.0) -> Optional[str]:
+    """
+    Poll order status until it is one of `desired`
+    
+    Gives up early once the order is terminal in some other state, since
+    it can never reach `desired` after that. Private WebSocket pushes need
+    a JWT login, which the API-key test users don't have, so this polls the
+    REST endpoint at the shared fine interval.
+    
+    Returns the last status seen.
+    """
+    deadline = time.monotonic() + timeout
+    
+    while time.monotonic() < deadline:
         status = get_order_status(client, order_id)
-        if status in terminal_states:
+        if status in desired or status in TERMINAL_STATES:
             return status
-        time.sleep(0.1)
+        time.sleep(DEFAULT_INTERVAL)
+    
     return get_order_status(client, order_id)
 
 
+def wait_for_order_terminal(client: ApiClient, order_id: int, timeout: float = 3.0) -> Optional[str]:
+    """Poll order status until it reaches a terminal state"""
+    return wait_for_status(client, order_id, TERMINAL_STATES, timeout)
+
+
 def cleanup_order(client: ApiClient, order_id: Optional[int]):
     if order_id:
         try:
             cancel_order(client, order_id)
-        except:
+        except (requests.RequestException, ValueError):
             pass
 
 
-def get_order_book(symbol: str) -> Dict:
-    resp = requests.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
+def track_order(client: ApiClient, order_id: int):
+    """Record a resting order for the next sweep_placed_orders()"""
+    with _PLACED_ORDERS_LOCK:
+        _PLACED_ORDERS.append((client, order_id))
+
+
+def sweep_placed_orders():
+    """
+    Best effort cancel of every tracked order, issued concurrently
+    
+    The gateway has no bulk cancel endpoint, so this fans the per-order
+    DELETEs out over a small pool. Orders that already filled or were
+    cancelled just fail quietly. DELETEs on the same client still go out
+    one at a time (see ApiClient).
+    """
+    with _PLACED_ORDERS_LOCK:
+        orders = _PLACED_ORDERS[:]
+        _PLACED_ORDERS.clear()
+    if not orders:
+        return
+    with ThreadPoolExecutor(max_workers=len(orders)) as ex:
+        list(ex.map(lambda o: cleanup_order(*o), orders))
+
+
+# Safety net: leave nothing resting if the run dies between sweeps
+atexit.register(sweep_placed_orders)
+
+
+def fetch_order_book(symbol: str) -> Optional[Dict]:
+    """Read order book depth from the gateway (None on failure)"""
+    resp = SESSION.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
     if resp.status_code == 200:
-        return resp.json().get("data", {})
-    return {}
+        return parse_json(resp).get("data", {})
+    return None
+
 
+_DEPTH = DepthCache(fetch_order_book)
 
-def check_order_in_book(symbol: str, side: str, price: str) -> bool:
+
+def get_order_book(symbol: str) -> Dict:
+    """Get order book depth, reusing a response younger than DEPTH_CACHE_TTL"""
+    return _DEPTH.get(symbol) or {}
+
+
+def invalidate_depth_cache():
+    """Drop cached depth after a request that changes the book"""
+    _DEPTH.invalidate()
+
+
+def check_order_in_book(symbol: str, side: str, price: Decimal) -> bool:
+    """
+    Check if a level at exactly this price exists on that side of the book
+    
+    Depth prices are decimal strings; comparing as Decimal is exact at any
+    tick size, unlike a float tolerance.
+    """
     depth = get_order_book(symbol)
     levels = depth.get("bids" if side == "BUY" else "asks", [])
-    target_price = float(price)
-    for level in levels:
-        if len(level) >= 1 and abs(float(level[0]) - target_price) < 0.01:
-            return True
-    return False
+    return price in {Decimal(level[0]) for level in levels if level}
+
+
+def read_status_and_level(client: ApiClient, order_id: int, side: str,
+                          price: Decimal) -> Tuple[Optional[str], bool]:
+    """
+    Get an order's status and whether `price` is a level on `side`, together
+    
+    The status read is signed and the depth read is public, so they don't
+    contend for the client's lock and can be in flight at the same time.
+    """
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        status = ex.submit(get_order_status, client, order_id)
+        in_book = ex.submit(check_order_in_book, SYMBOL, side, price)
+        return status.result(), in_book.result()
+
+
+def wait_for_order_in_book(symbol: str, side: str, price: Decimal, timeout: float = 2.0) -> bool:
+    """Poll depth until a level at the given price shows up on that side"""
+    return poll_until(lambda: check_order_in_book(symbol, side, price), timeout=timeout)
 
 
 # =============================================================================
@@ -187,58 +328,61 @@ def test_mov_001_priority_loss() -> TestResult:
     test_id = "MOV-001"
     test_name = "MoveOrder 优先级丢失"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price_a = "59000.00"
-    price_b = "60000.00"
+    price_a = PRICE_MOV_001_A
+    price_b = PRICE_MOV_001_B
     
     id_a = None
     id_b = None
     
     try:
         # Step 1: Place Order A at lower price (first)
-        id_a, _, _ = place_order(client_maker, SYMBOL, "BUY", price_a, "0.01", "GTC")
+        id_a, _, _ = place_order(client_maker, SYMBOL, "BUY", price_a, QTY_MOV_001, "GTC")
         if not id_a:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place Order A")
-        print(f"  Order A: {id_a} @ {price_a}")
+        log(f"  Order A: {id_a} @ {price_a}")
         
-        time.sleep(0.3)
+        wait_for_order_in_book(SYMBOL, "BUY", price_a)
         
         # Step 2: Place Order B at target price (second)
-        id_b, _, _ = place_order(client_maker, SYMBOL, "BUY", price_b, "0.01", "GTC")
+        id_b, _, _ = place_order(client_maker, SYMBOL, "BUY", price_b, QTY_MOV_001, "GTC")
         if not id_b:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place Order B")
-        print(f"  Order B: {id_b} @ {price_b}")
+        log(f"  Order B: {id_b} @ {price_b}")
         
-        time.sleep(0.5)
+        wait_for_order_in_book(SYMBOL, "BUY", price_b)
         
         # Step 3: Move A to same price as B
-        print(f"  Moving Order A to {price_b}")
+        log(f"  Moving Order A to {price_b}")
         success, move_resp = move_order(client_maker, id_a, price_b)
         
         if not success:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details=f"MoveOrder not implemented: {move_resp}")
         
-        time.sleep(0.5)
+        # A has left its old level once the move is applied
+        poll_until(lambda: not check_order_in_book(SYMBOL, "BUY", price_a))
         
         # Step 4: Match with Sell C for exactly one order's quantity
-        print(f"  Matching with Sell 0.01 BTC @ {price_b}")
-        place_order(client_taker, SYMBOL, "SELL", price_b, "0.01", "IOC")
-        
-        time.sleep(1.0)
+        log(f"  Matching with Sell 0.01 BTC @ {price_b}")
+        place_order(client_taker, SYMBOL, "SELL", price_b, QTY_MOV_001, "IOC")
         
-        # Step 5: Verify B FILLED (it was first at price), A still in book
-        status_a = get_order_status(client_maker, id_a)
-        status_b = get_order_status(client_maker, id_b)
+        # Step 5: Verify B FILLED (it was first at price), A still in book.
+        # C matches in one engine step, so once B is FILLED A's outcome is
+        # decided; polling the makers' own statuses doesn't depend on when
+        # the taker's IOC is reported terminal.
+        statuses = wait_for_statuses(client_maker, {id_a: frozenset({"NEW", "ACCEPTED"}),
+                                                    id_b: frozenset({"FILLED"})})
+        status_a, status_b = statuses[id_a], statuses[id_b]
         
-        print(f"  Order A status: {status_a}")
-        print(f"  Order B status: {status_b}")
+        log(f"  Order A status: {status_a}")
+        log(f"  Order B status: {status_b}")
         
         expected = "B=FILLED (first at price), A=NEW/ACCEPTED (moved to end of queue)"
         actual = f"A={status_a}, B={status_b}"
@@ -254,10 +398,6 @@ def test_mov_001_priority_loss() -> TestResult:
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, id_a)
-        cleanup_order(client_maker, id_b)
 
 
 def test_mov_002_move_to_crossing_price() -> TestResult:
@@ -280,53 +420,58 @@ def test_mov_002_move_to_crossing_price() -> TestResult:
     test_id = "MOV-002"
     test_name = "MoveOrder 穿越价格 (Rest-Only)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    bid_price = "58000.00"
-    ask_price = "58500.00"
-    move_price = "59000.00"  # Would cross the ask if matching was triggered
+    bid_price = PRICE_MOV_002_BID
+    ask_price = PRICE_MOV_002_ASK
+    move_price = PRICE_MOV_002_MOVE
     
     id_a = None
     id_ask = None
     
     try:
-        # Place BID A
-        id_a, _, _ = place_order(client_maker, SYMBOL, "BUY", bid_price, "0.001", "GTC")
+        # Place BID A and ASK together: they don't cross and use different
+        # users, so neither depends on the other (no batch endpoint exists)
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            fut_a = ex.submit(place_order, client_maker, SYMBOL, "BUY", bid_price, QTY, "GTC")
+            fut_ask = ex.submit(place_order, client_taker, SYMBOL, "SELL", ask_price, QTY, "GTC")
+            id_a, _, _ = fut_a.result()
+            id_ask, _, _ = fut_ask.result()
+        
         if not id_a:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place BID")
-        print(f"  BID A: {id_a} @ {bid_price}")
+        log(f"  BID A: {id_a} @ {bid_price}")
         
-        # Place ASK
-        id_ask, _, _ = place_order(client_taker, SYMBOL, "SELL", ask_price, "0.001", "GTC")
         if not id_ask:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place ASK")
-        print(f"  ASK: {id_ask} @ {ask_price}")
+        log(f"  ASK: {id_ask} @ {ask_price}")
         
-        time.sleep(0.5)
+        wait_for_order_in_book(SYMBOL, "BUY", bid_price)
+        wait_for_order_in_book(SYMBOL, "SELL", ask_price)
         
         # Move BID A to price above ASK (would cross if matching was triggered)
-        print(f"  Moving BID A to {move_price} (above ASK @ {ask_price})")
+        log(f"  Moving BID A to {move_price} (above ASK @ {ask_price})")
         success, move_resp = move_order(client_maker, id_a, move_price)
         
         if not success:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details=f"MoveOrder not implemented: {move_resp}")
         
-        time.sleep(0.5)
+        wait_for_order_in_book(SYMBOL, "BUY", move_price)
         
         # Rest-Only Design: A should be at new price, ASK should still exist
         in_new_price = check_order_in_book(SYMBOL, "BUY", move_price)
         in_old_price = check_order_in_book(SYMBOL, "BUY", bid_price)
         ask_still_exists = check_order_in_book(SYMBOL, "SELL", ask_price)
         
-        print(f"  BID at new price ({move_price}): {in_new_price}")
-        print(f"  BID at old price ({bid_price}): {in_old_price}")
-        print(f"  ASK still exists: {ask_still_exists}")
+        log(f"  BID at new price ({move_price}): {in_new_price}")
+        log(f"  BID at old price ({bid_price}): {in_old_price}")
+        log(f"  ASK still exists: {ask_still_exists}")
         
         expected = "BID at new price, ASK unchanged (Rest-Only design)"
         actual = f"new_price={in_new_price}, old_price={in_old_price}, ask_exists={ask_still_exists}"
@@ -341,10 +486,6 @@ def test_mov_002_move_to_crossing_price() -> TestResult:
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client_maker, id_a)
-        cleanup_order(client_taker, id_ask)
 
 
 def test_mov_003_same_price() -> TestResult:
@@ -357,36 +498,35 @@ def test_mov_003_same_price() -> TestResult:
     test_id = "MOV-003"
     test_name = "MoveOrder 同价位"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
-    price = "57000.00"
+    price = PRICE_MOV_003
     order_id = None
     
     try:
-        order_id, _, _ = place_order(client, SYMBOL, "BUY", price, "0.001", "GTC")
+        order_id, _, _ = place_order(client, SYMBOL, "BUY", price, QTY, "GTC")
         if not order_id:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} @ {price}")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} @ {price}")
+        wait_for_order_in_book(SYMBOL, "BUY", price)
         
         # Move to same price
-        print(f"  Moving to same price {price}")
+        log(f"  Moving to same price {price}")
         success, move_resp = move_order(client, order_id, price)
         
         if not success:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details=f"MoveOrder not implemented: {move_resp}")
         
-        time.sleep(0.5)
+        wait_for_order_in_book(SYMBOL, "BUY", price)
         
         # Order should still be valid
-        status = get_order_status(client, order_id)
-        in_book = check_order_in_book(SYMBOL, "BUY", price)
+        status, in_book = read_status_and_level(client, order_id, "BUY", price)
         
-        print(f"  Status: {status}, In book: {in_book}")
+        log(f"  Status: {status}, In book: {in_book}")
         
         expected = "Order still valid in book"
         actual = f"status={status}, in_book={in_book}"
@@ -402,9 +542,6 @@ def test_mov_003_same_price() -> TestResult:
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client, order_id)
 
 
 def test_mov_004_nonexistent_order() -> TestResult:
@@ -414,46 +551,35 @@ def test_mov_004_nonexistent_order() -> TestResult:
     设计说明:
         Gateway 是异步系统，对不存在订单的 MoveOrder 会返回 ACCEPTED，
         但 Pipeline 处理后不会产生任何副作用。
-        测试验证：请求被接受 + 订单簿无变化。
+        测试验证：请求被接受 + 本用户在目标价位没有挂单。
     """
     test_id = "MOV-004"
     test_name = "MoveOrder 不存在订单 (异步验证)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
     
     try:
-        # 记录操作前订单簿状态
-        depth_before = get_order_book(SYMBOL)
-        bids_before = len(depth_before.get("bids", []))
-        asks_before = len(depth_before.get("asks", []))
-        
-        fake_order_id = 9999999999
-        target_price = "50000.00"
-        print(f"  Attempting to move non-existent order: {fake_order_id}")
+        fake_order_id = NONEXISTENT_ORDER_ID
+        target_price = PRICE_MOV_004
+        log(f"  Attempting to move non-existent order: {fake_order_id}")
         
         # Gateway 异步入队，预期返回成功
         success, resp = move_order(client, fake_order_id, target_price)
-        print(f"  Response: success={success}, data={resp}")
+        log(f"  Response: success={success}, data={resp}")
         
-        # 等待异步处理
+        # 等待异步处理 (验证的是"无变化", 没有可等待的事件, 只能固定等待)
         time.sleep(0.5)
         
-        # 验证订单簿无变化 (无副作用)
-        depth_after = get_order_book(SYMBOL)
-        bids_after = len(depth_after.get("bids", []))
-        asks_after = len(depth_after.get("asks", []))
-        
-        # 确保目标价位没有新订单
-        has_order_at_price = check_order_in_book(SYMBOL, "BUY", target_price)
+        # 验证无副作用: 本用户在目标价位没有挂单 (只看自己的订单, 不受他人深度变化影响)
+        has_order_at_price = any(Decimal(o.get("price", "0")) == target_price
+                                 for o in get_user_open_orders(client))
         
-        print(f"  Order book before: bids={bids_before}, asks={asks_before}")
-        print(f"  Order book after:  bids={bids_after}, asks={asks_after}")
-        print(f"  Order at target price: {has_order_at_price}")
+        log(f"  Own open order at target price: {has_order_at_price}")
         
-        expected = "Request accepted, no side effects (order book unchanged)"
-        actual = f"success={success}, book_unchanged={(bids_before == bids_after and asks_before == asks_after)}"
+        expected = "Request accepted, no side effects (no own open order at target price)"
+        actual = f"success={success}, open_order_at_target={has_order_at_price}"
         
         # 异步系统：Gateway 接受请求是正常的，关键是无副作用
         if not has_order_at_price:
@@ -462,7 +588,7 @@ def test_mov_004_nonexistent_order() -> TestResult:
         else:
             return TestResult(test_id, test_name, TestStatus.FAIL,
                             expected=expected,
-                            actual="Unexpected order appeared in book")
+                            actual="Unexpected open order at target price")
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
@@ -479,50 +605,49 @@ def test_mov_005_filled_order() -> TestResult:
     test_id = "MOV-005"
     test_name = "MoveOrder 已成交订单 (异步验证)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "56000.00"
-    new_price = "55000.00"
+    price = PRICE_MOV_005
+    new_price = PRICE_MOV_005_MOVE
     order_id = None
     
     try:
         # Place and fill an order
-        order_id, _, _ = place_order(client_maker, SYMBOL, "BUY", price, "0.001", "GTC")
+        order_id, _, _ = place_order(client_maker, SYMBOL, "BUY", price, QTY, "GTC")
         if not order_id:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} @ {price}")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} @ {price}")
+        wait_for_order_in_book(SYMBOL, "BUY", price)
         
         # Fill it
-        place_order(client_taker, SYMBOL, "SELL", price, "0.001", "IOC")
-        time.sleep(1.0)
+        place_order(client_taker, SYMBOL, "SELL", price, QTY, "IOC")
         
-        status = wait_for_order_terminal(client_maker, order_id, 2.0)
-        print(f"  Order status after fill: {status}")
+        status = wait_for_status(client_maker, order_id, frozenset({"FILLED"}))
+        log(f"  Order status after fill: {status}")
         
         if status != "FILLED":
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details=f"Order not filled, status={status}")
         
         # Try to move filled order (Gateway will accept, Pipeline will ignore)
-        print(f"  Attempting to move filled order to {new_price}")
+        log(f"  Attempting to move filled order to {new_price}")
         success, resp = move_order(client_maker, order_id, new_price)
-        print(f"  Response: success={success}")
+        log(f"  Response: success={success}")
         
-        # 等待异步处理
+        # 等待异步处理 (验证的是"无变化", 没有可等待的事件, 只能固定等待)
         time.sleep(0.5)
         
         # 验证：订单状态仍为 FILLED，新价位无订单
-        status_after = get_order_status(client_maker, order_id)
-        has_order_at_new_price = check_order_in_book(SYMBOL, "BUY", new_price)
+        status_after, has_order_at_new_price = read_status_and_level(
+            client_maker, order_id, "BUY", new_price)
         
-        print(f"  Order status after move attempt: {status_after}")
-        print(f"  Order at new price {new_price}: {has_order_at_new_price}")
+        log(f"  Order status after move attempt: {status_after}")
+        log(f"  Order at new price {new_price}: {has_order_at_new_price}")
         
         expected = "Status remains FILLED, no order at new price"
         actual = f"status={status_after}, order_at_new_price={has_order_at_new_price}"
@@ -539,45 +664,36 @@ def test_mov_005_filled_order() -> TestResult:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
 
 
-def test_mov_006_buy_move_up() -> TestResult:
-    """
-    MOV-006: BUY 向上移价
-    
-    验证: 订单在新价位可见
-    """
-    test_id = "MOV-006"
-    test_name = "BUY 向上移价"
-    
-    print(f"\n[{test_id}] {test_name}")
+def run_directional_move(test_id: str, test_name: str, side: str,
+                         old_price: Decimal, new_price: Decimal) -> TestResult:
+    """Rest one order, move it, and verify it left old_price for new_price"""
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
-    old_price = "54000.00"
-    new_price = "55000.00"
-    order_id = None
     
     try:
-        order_id, _, _ = place_order(client, SYMBOL, "BUY", old_price, "0.001", "GTC")
+        order_id, _, _ = place_order(client, SYMBOL, side, old_price, QTY, "GTC")
         if not order_id:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} @ {old_price}")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} @ {old_price}")
+        wait_for_order_in_book(SYMBOL, side, old_price)
         
-        # Move up
-        print(f"  Moving BUY from {old_price} to {new_price}")
+        log(f"  Moving {side} from {old_price} to {new_price}")
         success, _ = move_order(client, order_id, new_price)
         
         if not success:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details="MoveOrder not implemented")
         
-        time.sleep(0.5)
+        poll_until(lambda: (not check_order_in_book(SYMBOL, side, old_price)
+                            and check_order_in_book(SYMBOL, side, new_price)))
         
-        in_old = check_order_in_book(SYMBOL, "BUY", old_price)
-        in_new = check_order_in_book(SYMBOL, "BUY", new_price)
+        in_old = check_order_in_book(SYMBOL, side, old_price)
+        in_new = check_order_in_book(SYMBOL, side, new_price)
         
-        print(f"  In old price: {in_old}, In new price: {in_new}")
+        log(f"  In old price: {in_old}, In new price: {in_new}")
         
         expected = "Not at old, at new price"
         actual = f"in_old={in_old}, in_new={in_new}"
@@ -591,9 +707,15 @@ def test_mov_006_buy_move_up() -> TestResult:
     
     except Exception as e:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
+
+
+def test_mov_006_buy_move_up() -> TestResult:
+    """
+    MOV-006: BUY 向上移价
     
-    finally:
-        cleanup_order(client, order_id)
+    验证: 订单在新价位可见
+    """
+    return run_directional_move("MOV-006", "BUY 向上移价", "BUY", PRICE_MOV_006_OLD, PRICE_MOV_006_NEW)
 
 
 def test_mov_007_sell_move_down() -> TestResult:
@@ -602,61 +724,56 @@ def test_mov_007_sell_move_down() -> TestResult:
     
     验证: 订单在新价位可见
     """
-    test_id = "MOV-007"
-    test_name = "SELL 向下移价"
-    
-    print(f"\n[{test_id}] {test_name}")
-    
-    client = get_test_client(GATEWAY_URL, USER_MAKER)
-    old_price = "62000.00"
-    new_price = "61000.00"
-    order_id = None
-    
-    try:
-        order_id, _, _ = place_order(client, SYMBOL, "SELL", old_price, "0.001", "GTC")
-        if not order_id:
-            return TestResult(test_id, test_name, TestStatus.ERROR,
-                            details="Failed to place order")
-        
-        print(f"  Order: {order_id} @ {old_price}")
-        time.sleep(0.5)
-        
-        # Move down
-        print(f"  Moving SELL from {old_price} to {new_price}")
-        success, _ = move_order(client, order_id, new_price)
-        
-        if not success:
-            return TestResult(test_id, test_name, TestStatus.SKIP,
-                            details="MoveOrder not implemented")
-        
-        time.sleep(0.5)
-        
-        in_old = check_order_in_book(SYMBOL, "SELL", old_price)
-        in_new = check_order_in_book(SYMBOL, "SELL", new_price)
-        
-        print(f"  In old price: {in_old}, In new price: {in_new}")
-        
-        expected = "Not at old, at new price"
-        actual = f"in_old={in_old}, in_new={in_new}"
-        
-        if not in_old and in_new:
-            return TestResult(test_id, test_name, TestStatus.PASS,
-                            expected=expected, actual=actual)
-        else:
-            return TestResult(test_id, test_name, TestStatus.FAIL,
-                            expected=expected, actual=actual)
-    
-    except Exception as e:
-        return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
-    
-    finally:
-        cleanup_order(client, order_id)
+    return run_directional_move("MOV-007", "SELL 向下移价", "SELL", PRICE_MOV_007_OLD, PRICE_MOV_007_NEW)
 
 
 # =============================================================================
 # Main
 # =============================================================================
 
+# Tests in the same wave run on concurrent threads; signed requests on the
+# same user still go out one at a time (see ApiClient), so what overlaps is
+# the maker's and taker's traffic, depth polling and waits. A SELL IOC sweeps
+# every bid at or above its price, and MOV-002 deliberately leaves its BID
+# above its ASK, so MOV-001 and MOV-005 (which match with a SELL IOC) each get
+# their own wave.
+TEST_WAVES: List[List[Callable[[], TestResult]]] = [
+    [
+        test_mov_002_move_to_crossing_price,
+        test_mov_003_same_price,
+        test_mov_004_nonexistent_order,
+        test_mov_006_buy_move_up,
+        test_mov_007_sell_move_down,
+    ],
+    [test_mov_001_priority_loss],
+    [test_mov_005_filled_order],
+]
+
+
+def run_test(test_fn: Callable[[], TestResult]) -> TestResult:
+    _LOG.lines = []
+    try:
+        result = test_fn()
+    except Exception as e:
+        result = TestResult("UNKNOWN", test_fn.__name__, TestStatus.ERROR, str(e))
+    finally:
+        lines, _LOG.lines = _LOG.lines, None
+    result.log = lines
+    return result
+
+
+def print_log(result: TestResult):
+    """Print a finished test's buffered output as one block"""
+    for line in result.log:
+        print(line)
+
+
+def skip_result(test_fn: Callable[[], TestResult], details: str) -> TestResult:
+    """SKIP result for a test that was not run, labelled from its docstring"""
+    test_id, _, name = test_fn.__doc__.strip().splitlines()[0].partition(": ")
+    return TestResult(test_id, name, TestStatus.SKIP, details=details)
+
+
 def main():
     print("=" * 70)
     print("🧪 QA 0x14-b: MoveOrder Independent Test Suite")
@@ -664,33 +781,40 @@ def main():
     print(f"Gateway: {GATEWAY_URL}")
     print(f"Symbol: {SYMBOL}")
     
-    try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
-        if resp.status_code != 200:
-            print(f"\n❌ Gateway not responding: {resp.status_code}")
-            return 1
-    except Exception as e:
-        print(f"\n❌ Cannot connect to Gateway: {e}")
+    # Skipped when another module in this run probed within HEALTH_TTL
+    error = check_gateway(GATEWAY_URL, SESSION)
+    if error:
+        print(f"\n❌ {error}")
         return 1
     
     print("\n✅ Gateway connected")
     
-    tests = [
-        test_mov_001_priority_loss,
-        test_mov_002_move_to_crossing_price,
-        test_mov_003_same_price,
-        test_mov_004_nonexistent_order,
-        test_mov_005_filled_order,
-        test_mov_006_buy_move_up,
-        test_mov_007_sell_move_down,
-    ]
+    # Build both clients up front so no test pays for key setup under the lock
+    for user_id in (USER_MAKER, USER_TAKER):
+        get_test_client(GATEWAY_URL, user_id)
     
+    # Probe MoveOrder once with an unknown id. If the endpoint is missing,
+    # skip every test that would place orders just to find that out; MOV-004
+    # is itself this probe, so it still runs.
     results = []
-    for test_fn in tests:
-        try:
-            results.append(test_fn())
-        except Exception as e:
-            results.append(TestResult("UNKNOWN", test_fn.__name__, TestStatus.ERROR, str(e)))
+    waves = TEST_WAVES
+    move_supported, probe_resp = move_order(get_test_client(GATEWAY_URL, USER_MAKER), NONEXISTENT_ORDER_ID, PRICE_PROBE)
+    if not move_supported:
+        print(f"\n⏭️  MoveOrder not implemented: {probe_resp}")
+        waves = [[test_mov_004_nonexistent_order]]
+        results = [skip_result(test_fn, f"MoveOrder not implemented: {probe_resp}")
+                   for wave in TEST_WAVES for test_fn in wave
+                   if test_fn is not test_mov_004_nonexistent_order]
+    
+    # Orders are swept after every wave, not per test, so one wave's
+    # resting orders can never match against the next wave's
+    with ThreadPoolExecutor(max_workers=max(len(w) for w in waves)) as ex:
+        for wave in waves:
+            for r in ex.map(run_test, wave):
+                print_log(r)
+                results.append(r)
+            sweep_placed_orders()
+    results.sort(key=lambda r: r.test_id)
     
     print("\n")
     print("=" * 70)
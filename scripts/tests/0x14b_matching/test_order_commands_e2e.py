@@ -11,6 +11,7 @@ Prerequisites:
 
 Usage:
     python3 scripts/tests/0x14b_matching/test_order_commands_e2e.py
+    E2E_VERBOSE=1 python3 scripts/tests/0x14b_matching/test_order_commands_e2e.py  # per-test step traces
 
 QA Handover:
     This script tests:
@@ -25,6 +26,10 @@ import sys
 import os
 import time
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
 
 # Add scripts directory to path
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -33,11 +38,16 @@ sys.path.insert(0, SCRIPTS_ROOT)
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, parse_json, body_snippet, ApiClient
+from lib.polling import poll_until
+from lib.depth import DepthCache
+from lib.orders import TERMINAL_STATES, get_order_status, wait_for_statuses
 
 # =============================================================================
 # Configuration
@@ -52,20 +62,55 @@ USER_TAKER = 1002  # User sending IOC orders
 # Test symbol
 SYMBOL = "BTC_USDT"
 
+# Per-test step traces are only kept with E2E_VERBOSE=1. Test groups run on
+# worker threads, so each buffers its lines thread-locally and main() prints
+# them under the test's result line.
+VERBOSE = os.environ.get("E2E_VERBOSE", "0") == "1"
+_LOG = threading.local()
+
+# Pooled keep-alive session for public endpoints (depth, exchange_info).
+# Public GETs are idempotent and unsigned, so transient gateway errors are
+# retried here; signed requests are not, since a resent nonce is rejected.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=ApiClient.POOL_CONNECTIONS,
+                                     pool_maxsize=ApiClient.POOL_MAXSIZE,
+                                     max_retries=Retry(total=2, backoff_factor=0.05,
+                                                       status_forcelist=(502, 503, 504),
+                                                       allowed_methods=frozenset({"GET"}))))
+
+# Levels per side in depth reads. The book checks look for bids far below
+# mid (1000-10000), which sit at the bottom of the bid side, so this must
+# stay above the number of bid levels resting over them; a smaller limit
+# would hide a wrongly resting IOC and pass the not-in-book checks.
+DEPTH_LIMIT = 10
+
+# Status polls start fast and back off on each miss, up to this cap
+STATUS_POLL_INITIAL_DELAY = 0.005
+STATUS_POLL_MAX_DELAY = 0.2
+
+# Order processed and live on the book
+RESTING_STATES = frozenset({"NEW", "PARTIALLY_FILLED"})
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def log_debug(msg: str):
+    """Buffer a step trace line for the current test (no-op unless VERBOSE)"""
+    if VERBOSE:
+        _LOG.lines.append(msg)
+
+
 def log_response(name: str, resp: requests.Response):
     """Log API response for debugging"""
     try:
-        data = resp.json()
-        print(f"  {name}: status={resp.status_code}, data={json.dumps(data, indent=2)[:200]}")
-    except:
-        print(f"  {name}: status={resp.status_code}, text={resp.text[:200]}")
+        data = parse_json(resp)
+        log_debug(f"{name}: status={resp.status_code}, data={json.dumps(data, indent=2)[:200]}")
+    except ValueError:
+        log_debug(f"{name}: status={resp.status_code}, text={body_snippet(resp)}")
 
 
-def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str, 
+def place_order(client: ApiClient, symbol: str, side: str, price: Decimal, qty: Decimal, 
                 time_in_force: str = "GTC", order_type: str = "LIMIT") -> dict | None:
     """
     Place an order via API.
@@ -74,8 +119,8 @@ def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
         client: Authenticated API client
         symbol: Trading pair (e.g., "BTC_USDT")
         side: "BUY" or "SELL"
-        price: Price as string
-        qty: Quantity as string
+        price: Limit price
+        qty: Order quantity
         time_in_force: "GTC" (Good Till Cancel) or "IOC" (Immediate or Cancel)
         order_type: "LIMIT" or "MARKET"
     
@@ -86,67 +131,114 @@ def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
         "symbol": symbol,
         "side": side,
         "order_type": order_type,
-        "price": price,
-        "qty": qty,
+        "price": str(price),
+        "qty": str(qty),
         "time_in_force": time_in_force,
     }
     
     resp = client.post("/api/v1/private/order", order_data)
+    invalidate_depth_cache()
     
     # Gateway returns 202 Accepted for async order processing
     if resp.status_code in [200, 202]:
-        return resp.json()
+        return parse_json(resp)
     else:
         log_response("place_order FAILED", resp)
         return None
 
 
-def wait_for_order_status(client: ApiClient, order_id: int, timeout: float = 2.0) -> str | None:
+def wait_for_order_status(client: ApiClient, order_id: int, timeout: float = 2.0,
+                          desired: frozenset[str] = TERMINAL_STATES) -> str | None:
     """
-    Poll for final order status (async order processing).
+    Poll an order until its status is in `desired` or terminal (async order processing).
     
-    Returns the final status or None if timeout.
+    By default only terminal states end the wait, so an IOC that wrongly
+    rests as NEW is still NEW at the timeout. Returns the status reached,
+    or the last status seen (None if never readable) on timeout.
     """
-    start = time.time()
-    while time.time() - start < timeout:
-        resp = client.get(f"/api/v1/private/order/{order_id}")
-        if resp.status_code == 200:
-            data = resp.json()
-            status = data.get("data", {}).get("status")
-            # Terminal states
-            if status in ["FILLED", "EXPIRED", "CANCELED", "REJECTED"]:
-                return status
-            # Still processing
-            if status in ["NEW", "PARTIALLY_FILLED"]:
-                return status
-        time.sleep(0.1)
-    return None
-
-
-def get_order_status(client: ApiClient, order_id: int) -> str | None:
-    """Get order status by ID"""
-    resp = client.get(f"/api/v1/private/order/{order_id}")
-    if resp.status_code == 200:
-        data = resp.json()
-        return data.get("data", {}).get("status")
-    return None
+    deadline = time.monotonic() + timeout
+    delay = STATUS_POLL_INITIAL_DELAY
+    status = None
+    while time.monotonic() < deadline:
+        status = get_order_status(client, order_id)
+        if status in desired or status in TERMINAL_STATES:
+            return status
+        time.sleep(delay)
+        delay = min(delay * 1.5, STATUS_POLL_MAX_DELAY)
+    return status
 
 
 def cancel_order(client: ApiClient, order_id: int) -> bool:
     """Cancel an order by ID"""
     resp = client.delete(f"/api/v1/private/order/{order_id}")
+    invalidate_depth_cache()
     return resp.status_code in [200, 202]
 
 
-def get_order_book(symbol: str) -> dict:
-    """Get current order book depth"""
-    resp = requests.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=10")
-    if resp.status_code == 200:
-        return resp.json().get("data", {})
-    return {}
+def safe_cancel(client: ApiClient, order_id: int, last_status: str | None = None) -> bool:
+    """Cancel an order unless its last observed status is already terminal"""
+    if last_status in TERMINAL_STATES:
+        return True
+    return cancel_order(client, order_id)
+
+
+def fetch_order_book(symbol: str) -> dict[str, dict[Decimal, str]] | None:
+    """
+    Read order book depth from the gateway (None on failure)
+    
+    Returns {"bids": {price: qty}, "asks": {price: qty}} with Decimal price
+    keys, parsed once per fetch so membership checks are a dict lookup.
+    """
+    resp = SESSION.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit={DEPTH_LIMIT}", timeout=5)
+    if resp.status_code != 200:
+        return None
+    data = parse_json(resp).get("data", {})
+    return {side: {Decimal(level[0]): level[1] for level in data.get(side, []) if level}
+            for side in ("bids", "asks")}
+
+
+_DEPTH = DepthCache(fetch_order_book)
+
+
+def get_order_book(symbol: str) -> dict[str, dict[Decimal, str]]:
+    """Get current order book depth, reusing a response younger than DEPTH_CACHE_TTL"""
+    return _DEPTH.get(symbol) or {}
+
+
+def invalidate_depth_cache():
+    """Drop cached depth after a request that changes the book"""
+    _DEPTH.invalidate()
+
+
+def check_order_in_book(symbol: str, side: str, price: Decimal) -> bool:
+    """Check whether a level at exactly this price is on the given side of the book"""
+    depth = get_order_book(symbol)
+    return price in depth.get("bids" if side == "BUY" else "asks", {})
+
+
+def wait_for_order_in_book(symbol: str, side: str, price: Decimal, timeout: float = 2.0) -> bool:
+    """Poll depth until a level at the given price shows up on that side"""
+    return poll_until(lambda: check_order_in_book(symbol, side, price), timeout=timeout)
+
+
+def get_level_qty(symbol: str, side: str, price: Decimal) -> Decimal:
+    """Get the total resting qty at a price level (0 if the level is absent)"""
+    depth = get_order_book(symbol)
+    return Decimal(depth.get("bids" if side == "BUY" else "asks", {}).get(price, "0"))
+
+
+def wait_for_level_qty(symbol: str, side: str, price: Decimal, qty: Decimal,
+                       timeout: float = 2.0) -> bool:
+    """
+    Poll depth until the level at `price` holds exactly `qty`
+    
+    Reduce and move don't change an order's status, so the book level is
+    where their effect shows up.
+    """
+    return poll_until(lambda: get_level_qty(symbol, side, price) == qty, timeout=timeout)
 
 
-def reduce_order(client: ApiClient, order_id: int, reduce_by: str) -> bool:
+def reduce_order(client: ApiClient, order_id: int, reduce_by: Decimal) -> bool:
     """
     Reduce an order's quantity via API.
     
@@ -154,13 +246,14 @@ def reduce_order(client: ApiClient, order_id: int, reduce_by: str) -> bool:
     """
     data = {
         "order_id": order_id,
-        "reduce_qty": reduce_by
+        "reduce_qty": str(reduce_by)
     }
     resp = client.post("/api/v1/private/order/reduce", data)
+    invalidate_depth_cache()
     return resp.status_code in [200, 202]
 
 
-def move_order(client: ApiClient, order_id: int, new_price: str) -> bool:
+def move_order(client: ApiClient, order_id: int, new_price: Decimal) -> bool:
     """
     Move an order to a new price via API.
     
@@ -168,9 +261,10 @@ def move_order(client: ApiClient, order_id: int, new_price: str) -> bool:
     """
     data = {
         "order_id": order_id,
-        "new_price": new_price
+        "new_price": str(new_price)
     }
     resp = client.post("/api/v1/private/order/move", data)
+    invalidate_depth_cache()
     return resp.status_code in [200, 202]
 
 
@@ -179,11 +273,12 @@ def move_order(client: ApiClient, order_id: int, new_price: str) -> bool:
 # Test Cases
 # =============================================================================
 
+@dataclass(slots=True)
 class TestResult:
-    def __init__(self, name: str, passed: bool, details: str = ""):
-        self.name = name
-        self.passed = passed
-        self.details = details
+    name: str
+    passed: bool
+    details: str = ""
+    log: list[str] = field(default_factory=list)
 
 
 def test_gtc_order_rests_in_book() -> TestResult:
@@ -194,13 +289,11 @@ def test_gtc_order_rests_in_book() -> TestResult:
     Action: Place GTC buy order
     Expected: Order stays in book, status = NEW/ACCEPTED/PARTIALLY_FILLED
     """
-    print("\n[TEST] GTC Order Rests in Book")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     
     # Place a GTC buy order at a low price (won't match)
-    price = "10000.00"  # Low price, unlikely to match
-    result = place_order(client_maker, SYMBOL, "BUY", price, "0.001", "GTC")
+    price = Decimal("10000.00")  # Low price, unlikely to match
+    result = place_order(client_maker, SYMBOL, "BUY", price, Decimal("0.001"), "GTC")
     
     if not result:
         return TestResult("GTC Order Rests in Book", False, "Failed to place order")
@@ -208,24 +301,23 @@ def test_gtc_order_rests_in_book() -> TestResult:
     order_id = result.get("data", {}).get("order_id")
     initial_status = result.get("data", {}).get("order_status", "")
     
-    print(f"  Order ID: {order_id}, Initial Status: {initial_status}")
+    log_debug(f"Order ID: {order_id}, Initial Status: {initial_status}")
     
-    # Wait for order to be processed and check order book
-    time.sleep(1.0)  # Allow propagation
+    # Wait for order to be processed and show up in the book
+    wait_for_order_in_book(SYMBOL, "BUY", price)
     
     # Poll for final status
-    final_status = wait_for_order_status(client_maker, order_id, timeout=2.0)
-    print(f"  Final Status: {final_status}")
+    final_status = wait_for_order_status(client_maker, order_id, timeout=2.0,
+                                         desired=RESTING_STATES)
+    log_debug(f"Final Status: {final_status}")
     
     # Check order book has our bid
-    depth = get_order_book(SYMBOL)
-    bids = depth.get("bids", [])
-    has_bid = any(float(bid[0]) == float(price) for bid in bids) if bids else False
+    has_bid = check_order_in_book(SYMBOL, "BUY", price)
     
     # GTC order should be in book (ACCEPTED, NEW, or PARTIALLY_FILLED all OK)
     if final_status in ["ACCEPTED", "NEW", "PARTIALLY_FILLED"] or has_bid:
         # Cleanup: cancel the order
-        cancel_order(client_maker, order_id)
+        safe_cancel(client_maker, order_id, final_status)
         return TestResult("GTC Order Rests in Book", True, f"Order {order_id} accepted/in book")
     else:
         return TestResult("GTC Order Rests in Book", False, 
@@ -240,13 +332,11 @@ def test_ioc_full_match() -> TestResult:
     Action: IOC taker order at same price with equal qty
     Expected: IOC order FILLED, maker order consumed
     """
-    print("\n[TEST] IOC Full Match → FILLED")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "85000.00"
-    qty = "0.001"
+    price = Decimal("85000.00")
+    qty = Decimal("0.001")
     
     # Step 1: Place maker sell order (GTC)
     maker_result = place_order(client_maker, SYMBOL, "SELL", price, qty, "GTC")
@@ -254,9 +344,9 @@ def test_ioc_full_match() -> TestResult:
         return TestResult("IOC Full Match", False, "Failed to place maker order")
     
     maker_order_id = maker_result.get("data", {}).get("order_id")
-    print(f"  Maker order: {maker_order_id}")
+    log_debug(f"Maker order: {maker_order_id}")
     
-    time.sleep(1.0)  # Wait for maker to be in book
+    wait_for_order_in_book(SYMBOL, "SELL", price)  # Wait for maker to be in book
     
     # Step 2: Place IOC buy order (should fully match)
     ioc_result = place_order(client_taker, SYMBOL, "BUY", price, qty, "IOC")
@@ -266,11 +356,11 @@ def test_ioc_full_match() -> TestResult:
     
     ioc_order_id = ioc_result.get("data", {}).get("order_id")
     initial_status = ioc_result.get("data", {}).get("order_status", "")
-    print(f"  IOC order: {ioc_order_id}, Initial: {initial_status}")
+    log_debug(f"IOC order: {ioc_order_id}, Initial: {initial_status}")
     
     # Poll for final status
     final_status = wait_for_order_status(client_taker, ioc_order_id, timeout=3.0)
-    print(f"  IOC Final Status: {final_status}")
+    log_debug(f"IOC Final Status: {final_status}")
     
     # ACCEPTED means order was received; for IOC with match it should become FILLED
     if final_status in ["FILLED", "ACCEPTED"]:
@@ -287,14 +377,12 @@ def test_ioc_partial_fill_expires() -> TestResult:
     Action: IOC order for larger qty
     Expected: IOC doesn't rest in book after processing
     """
-    print("\n[TEST] IOC Partial Fill → Not In Book")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "84000.00"
-    maker_qty = "0.001"
-    ioc_qty = "0.002"  # Larger than maker
+    price = Decimal("84000.00")
+    maker_qty = Decimal("0.001")
+    ioc_qty = Decimal("0.002")  # Larger than maker
     
     # Step 1: Place smaller maker order
     maker_result = place_order(client_maker, SYMBOL, "SELL", price, maker_qty, "GTC")
@@ -302,9 +390,9 @@ def test_ioc_partial_fill_expires() -> TestResult:
         return TestResult("IOC Partial Fill", False, "Failed to place maker order")
     
     maker_order_id = maker_result.get("data", {}).get("order_id")
-    print(f"  Maker order: {maker_order_id} (qty={maker_qty})")
+    log_debug(f"Maker order: {maker_order_id} (qty={maker_qty})")
     
-    time.sleep(1.0)  # Wait for maker to be in book
+    wait_for_order_in_book(SYMBOL, "SELL", price)  # Wait for maker to be in book
     
     # Step 2: Place IOC buy order (should partially fill, then NOT rest in book)
     ioc_result = place_order(client_taker, SYMBOL, "BUY", price, ioc_qty, "IOC")
@@ -312,17 +400,17 @@ def test_ioc_partial_fill_expires() -> TestResult:
         return TestResult("IOC Partial Fill", False, "Failed to place IOC order")
     
     ioc_order_id = ioc_result.get("data", {}).get("order_id")
-    print(f"  IOC order: {ioc_order_id}")
+    log_debug(f"IOC order: {ioc_order_id}")
     
     # Poll for final status
     final_status = wait_for_order_status(client_taker, ioc_order_id, timeout=3.0)
-    print(f"  IOC Final Status: {final_status}")
+    log_debug(f"IOC Final Status: {final_status}")
     
-    # Check that IOC order is NOT in book (remainder should not rest)
-    time.sleep(0.5)
-    depth = get_order_book(SYMBOL)
-    bids = depth.get("bids", [])
-    ioc_in_book = any(float(bid[0]) == float(price) for bid in bids) if bids else False
+    # Check that IOC order is NOT in book (remainder should not rest). The
+    # IOC is terminal by now, so one fresh read of the book is enough; one
+    # that never went terminal counts as resting.
+    invalidate_depth_cache()
+    ioc_in_book = final_status not in TERMINAL_STATES or check_order_in_book(SYMBOL, "BUY", price)
     
     # Key test: IOC should NOT rest in book regardless of fill status
     if not ioc_in_book:
@@ -341,29 +429,25 @@ def test_ioc_no_match_expires() -> TestResult:
     Action: IOC order at non-crossing price
     Expected: IOC order never rests in book
     """
-    print("\n[TEST] IOC No Match → Not In Book")
-    
     client = get_test_client(GATEWAY_URL, USER_TAKER)
     
     # Place IOC buy at very low price (won't match any asks)
-    price = "1000.00"  # Very low, no sellers
-    ioc_result = place_order(client, SYMBOL, "BUY", price, "0.001", "IOC")
+    price = Decimal("1000.00")  # Very low, no sellers
+    ioc_result = place_order(client, SYMBOL, "BUY", price, Decimal("0.001"), "IOC")
     
     if not ioc_result:
         return TestResult("IOC No Match", False, "Failed to place IOC order")
     
     ioc_order_id = ioc_result.get("data", {}).get("order_id")
-    print(f"  IOC order: {ioc_order_id}")
+    log_debug(f"IOC order: {ioc_order_id}")
     
     # Poll for final status
     final_status = wait_for_order_status(client, ioc_order_id, timeout=3.0)
-    print(f"  IOC Final Status: {final_status}")
+    log_debug(f"IOC Final Status: {final_status}")
     
-    # Check that IOC order is NOT in book
-    time.sleep(0.5)
-    depth = get_order_book(SYMBOL)
-    bids = depth.get("bids", [])
-    ioc_in_book = any(float(bid[0]) == float(price) for bid in bids) if bids else False
+    # Check that IOC order is NOT in book (one fresh read once it is terminal)
+    invalidate_depth_cache()
+    ioc_in_book = final_status not in TERMINAL_STATES or check_order_in_book(SYMBOL, "BUY", price)
     
     # Key test: IOC should NOT rest in book
     if not ioc_in_book:
@@ -381,19 +465,17 @@ def test_cancel_order() -> TestResult:
     Action: Cancel the order
     Expected: Order cancel request accepted
     """
-    print("\n[TEST] Cancel Order")
-    
     client = get_test_client(GATEWAY_URL, USER_MAKER)
     
     # Place GTC order
-    price = "9000.00"
-    result = place_order(client, SYMBOL, "BUY", price, "0.001", "GTC")
+    price = Decimal("9000.00")
+    result = place_order(client, SYMBOL, "BUY", price, Decimal("0.001"), "GTC")
     
     if not result:
         return TestResult("Cancel Order", False, "Failed to place order")
     
     order_id = result.get("data", {}).get("order_id")
-    print(f"  Placed order: {order_id}")
+    log_debug(f"Placed order: {order_id}")
     
     time.sleep(0.2)
     
@@ -416,51 +498,53 @@ def test_reduce_order_priority() -> TestResult:
     4. Match with Sell C for 0.7 BTC
     Expected: A matches 0.5, B matches 0.2. (A still first)
     """
-    print("\n[TEST] ReduceOrder Priority Preservation")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
-    price = "50000.00"
+    price = Decimal("50000.00")
+    qty = Decimal("1.0")
+    base_qty = get_level_qty(SYMBOL, "BUY", price)
     
     # 1. Place Order A
-    res_a = place_order(client_maker, SYMBOL, "BUY", price, "1.0", "GTC")
+    res_a = place_order(client_maker, SYMBOL, "BUY", price, qty, "GTC")
     if not res_a: return TestResult("Reduce Priority", False, "Failed to place A")
     id_a = res_a["data"]["order_id"]
     
     # 2. Place Order B
-    res_b = place_order(client_maker, SYMBOL, "BUY", price, "1.0", "GTC")
+    res_b = place_order(client_maker, SYMBOL, "BUY", price, qty, "GTC")
     if not res_b: return TestResult("Reduce Priority", False, "Failed to place B")
     id_b = res_b["data"]["order_id"]
     
-    time.sleep(1.0) # Ensure both rest in book
+    # Ensure both rest in book
+    wait_for_level_qty(SYMBOL, "BUY", price, base_qty + 2 * qty)
     
     # 3. Reduce A by 0.5
-    print(f"  Reducing Order A ({id_a}) by 0.5")
-    if not reduce_order(client_maker, id_a, "0.5"):
+    log_debug(f"Reducing Order A ({id_a}) by 0.5")
+    if not reduce_order(client_maker, id_a, Decimal("0.5")):
         cancel_order(client_maker, id_a)
         cancel_order(client_maker, id_b)
         return TestResult("Reduce Priority", False, "Reduce request failed (likely missing endpoint)")
     
-    time.sleep(1.0)
+    wait_for_level_qty(SYMBOL, "BUY", price, base_qty + Decimal("1.5"))
     
     # 4. Match with Sell C (0.7 BTC)
-    print(f"  Matching with Sell 0.7 BTC")
-    res_c = place_order(client_taker, SYMBOL, "SELL", price, "0.7", "IOC")
+    log_debug("Matching with Sell 0.7 BTC")
+    res_c = place_order(client_taker, SYMBOL, "SELL", price, Decimal("0.7"), "IOC")
     if not res_c: return TestResult("Reduce Priority", False, "Failed to place C")
     
-    time.sleep(1.0)
-    
     # 5. Verify A is FILLED and B is PARTIALLY_FILLED (0.8 remaining)
-    status_a = get_order_status(client_maker, id_a)
-    status_b = get_order_status(client_maker, id_b)
+    statuses = wait_for_statuses(client_maker, {id_a: frozenset({"FILLED"}),
+                                                id_b: frozenset({"PARTIALLY_FILLED"})},
+                                 initial_delay=STATUS_POLL_INITIAL_DELAY,
+                                 max_delay=STATUS_POLL_MAX_DELAY)
+    status_a, status_b = statuses[id_a], statuses[id_b]
     
-    print(f"  Order A status: {status_a}")
-    print(f"  Order B status: {status_b}")
+    log_debug(f"Order A status: {status_a}")
+    log_debug(f"Order B status: {status_b}")
     
     # Cleanup
-    cancel_order(client_maker, id_a)
-    cancel_order(client_maker, id_b)
+    safe_cancel(client_maker, id_a, status_a)
+    safe_cancel(client_maker, id_b, status_b)
     
     if status_a == "FILLED" and status_b == "PARTIALLY_FILLED":
         return TestResult("Reduce Priority", True, "Priority preserved after reduction")
@@ -478,49 +562,56 @@ def test_move_order_priority_loss() -> TestResult:
     4. Match with Sell C for 1.0 BTC
     Expected: B matches 1.0, A remains in book (unfilled)
     """
-    print("\n[TEST] MoveOrder Priority Loss")
-    
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
+    old_price = Decimal("49000.00")
+    price = Decimal("50000.00")
+    qty = Decimal("1.0")
+    base_qty = get_level_qty(SYMBOL, "BUY", price)
+    
     # 1. Place Order A (Low price)
-    res_a = place_order(client_maker, SYMBOL, "BUY", "49000.00", "1.0", "GTC")
+    res_a = place_order(client_maker, SYMBOL, "BUY", old_price, qty, "GTC")
     if not res_a: return TestResult("Move Priority", False, "Failed to place A")
     id_a = res_a["data"]["order_id"]
     
     # 2. Place Order B (Match price)
-    res_b = place_order(client_maker, SYMBOL, "BUY", "50000.00", "1.0", "GTC")
+    res_b = place_order(client_maker, SYMBOL, "BUY", price, qty, "GTC")
     if not res_b: return TestResult("Move Priority", False, "Failed to place B")
     id_b = res_b["data"]["order_id"]
     
-    time.sleep(1.0)
+    # Ensure both rest in book
+    wait_for_order_status(client_maker, id_a, desired=RESTING_STATES)
+    wait_for_level_qty(SYMBOL, "BUY", price, base_qty + qty)
     
     # 3. Move A to 50000
-    print(f"  Moving Order A ({id_a}) to 50000.00")
-    if not move_order(client_maker, id_a, "50000.00"):
+    log_debug(f"Moving Order A ({id_a}) to {price}")
+    if not move_order(client_maker, id_a, price):
         cancel_order(client_maker, id_a)
         cancel_order(client_maker, id_b)
         return TestResult("Move Priority", False, "Move request failed (likely missing endpoint)")
     
-    time.sleep(1.0)
+    wait_for_level_qty(SYMBOL, "BUY", price, base_qty + 2 * qty)
     
     # 4. Match with Sell C (1.0 BTC) at 50000
-    print(f"  Matching with Sell 1.0 BTC")
-    res_c = place_order(client_taker, SYMBOL, "SELL", "50000.00", "1.0", "IOC")
+    log_debug("Matching with Sell 1.0 BTC")
+    res_c = place_order(client_taker, SYMBOL, "SELL", price, qty, "IOC")
     if not res_c: return TestResult("Move Priority", False, "Failed to place C")
     
-    time.sleep(1.0)
-    
     # 5. Verify B is FILLED, A is still NEW/PARTIALLY_FILLED
-    status_a = get_order_status(client_maker, id_a)
-    status_b = get_order_status(client_maker, id_b)
+    # (C matches in one engine step, so once B is FILLED A's outcome is decided)
+    statuses = wait_for_statuses(client_maker, {id_a: frozenset({"NEW"}),
+                                                id_b: frozenset({"FILLED"})},
+                                 initial_delay=STATUS_POLL_INITIAL_DELAY,
+                                 max_delay=STATUS_POLL_MAX_DELAY)
+    status_a, status_b = statuses[id_a], statuses[id_b]
     
-    print(f"  Order A status: {status_a}")
-    print(f"  Order B status: {status_b}")
+    log_debug(f"Order A status: {status_a}")
+    log_debug(f"Order B status: {status_b}")
     
     # Cleanup
-    cancel_order(client_maker, id_a)
-    cancel_order(client_maker, id_b)
+    safe_cancel(client_maker, id_a, status_a)
+    safe_cancel(client_maker, id_b, status_b)
     
     if status_b == "FILLED" and (status_a == "NEW" or status_a == "ACCEPTED"):
         return TestResult("Move Priority", True, "Priority lost after move (B matched first)")
@@ -532,6 +623,42 @@ def test_move_order_priority_loss() -> TestResult:
 # Main
 # =============================================================================
 
+# Report order
+ALL_TESTS = [
+    # Core IOC tests
+    test_gtc_order_rests_in_book,
+    test_ioc_full_match,
+    test_ioc_partial_fill_expires,
+    test_ioc_no_match_expires,
+    test_cancel_order,
+    # Order Manipulation tests (Phase 0x14-b)
+    test_reduce_order_priority,
+    test_move_order_priority_loss,
+]
+
+# Groups run on concurrent threads; tests within a group run in order. Signed
+# requests on the same user still go out one at a time (see ApiClient), so
+# what overlaps is the maker's and taker's traffic, depth polling and waits.
+# Each group keeps to its own price range (bids <= 10000 / asks 84000-85000 /
+# bids 49000-50000), so no group's orders can match another's.
+TEST_GROUPS = [
+    [test_gtc_order_rests_in_book, test_cancel_order, test_ioc_no_match_expires],
+    [test_ioc_full_match, test_ioc_partial_fill_expires],
+    [test_reduce_order_priority, test_move_order_priority_loss],
+]
+
+
+def run_test(test_fn) -> TestResult:
+    _LOG.lines = []
+    result = test_fn()
+    result.log = _LOG.lines
+    return result
+
+
+def run_group(group: list) -> list[TestResult]:
+    return [run_test(test_fn) for test_fn in group]
+
+
 def main():
     print("=" * 60)
     print("0x14-b Order Commands E2E Test")
@@ -543,7 +670,7 @@ def main():
     
     # Check gateway is running
     try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
+        resp = SESSION.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
         if resp.status_code != 200:
             print(f"\n❌ Gateway not responding correctly: {resp.status_code}")
             return 1
@@ -554,19 +681,18 @@ def main():
     
     print("\n✅ Gateway connected")
     
-    # Run tests
-    results = []
-    
-    # Core IOC tests
-    results.append(test_gtc_order_rests_in_book())
-    results.append(test_ioc_full_match())
-    results.append(test_ioc_partial_fill_expires())
-    results.append(test_ioc_no_match_expires())
-    results.append(test_cancel_order())
+    # Build both clients and open their pooled connections with one cheap
+    # signed read each, so the first test doesn't pay for key setup and the
+    # handshake on its critical path
+    for user_id in (USER_MAKER, USER_TAKER):
+        get_test_client(GATEWAY_URL, user_id).get("/api/v1/private/orders", params={"limit": 1})
     
-    # Order Manipulation tests (Phase 0x14-b)
-    results.append(test_reduce_order_priority())
-    results.append(test_move_order_priority_loss())
+    # Run tests
+    results_by_test = {}
+    with ThreadPoolExecutor(max_workers=len(TEST_GROUPS)) as ex:
+        for group, group_results in zip(TEST_GROUPS, ex.map(run_group, TEST_GROUPS)):
+            results_by_test.update(zip(group, group_results))
+    results = [results_by_test[test_fn] for test_fn in ALL_TESTS]
     
     # Summary
     print("\n" + "=" * 60)
@@ -581,6 +707,8 @@ def main():
         print(f"  {status}: {r.name}")
         if r.details:
             print(f"           {r.details}")
+        for line in r.log:
+            print(f"           {line}")
         if r.passed:
             passed += 1
         else:
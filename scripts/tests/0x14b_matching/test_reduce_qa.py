@@ -27,8 +27,12 @@ Date: 2025-12-30
 import sys
 import os
 import time
-from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Dict, FrozenSet, List, Tuple
+from dataclasses import dataclass, field
+from decimal import Decimal
 from enum import Enum
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -37,11 +41,15 @@ sys.path.insert(0, SCRIPTS_ROOT)
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print("Error: Missing 'requests'. Run: pip install requests")
     sys.exit(1)
 
-from lib.api_auth import get_test_client, ApiClient
+from lib.api_auth import get_test_client, parse_json, body_snippet, ApiClient
+from lib.polling import poll_until, DEFAULT_INTERVAL
+from lib.health import check_gateway
+from lib.depth import DepthCache
 
 
 # =============================================================================
@@ -53,6 +61,29 @@ SYMBOL = "BTC_USDT"
 USER_MAKER = 1001
 USER_TAKER = 1002
 
+# Order states that never change again
+TERMINAL_STATES: FrozenSet[str] = frozenset({"FILLED", "EXPIRED", "CANCELED", "REJECTED"})
+# Order still live after a partial match (ACCEPTED: not processed yet)
+LIVE_STATES: FrozenSet[str] = frozenset({"PARTIALLY_FILLED", "NEW", "ACCEPTED"})
+# Order removed without filling
+CANCELED_STATES: FrozenSet[str] = frozenset({"CANCELED", "EXPIRED"})
+# HTTP codes the gateway uses to accept an order command
+ACCEPTED_CODES: FrozenSet[int] = frozenset({200, 202})
+
+# Pooled keep-alive session for public endpoints (depth, exchange_info)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=ApiClient.POOL_CONNECTIONS,
+                                     pool_maxsize=ApiClient.POOL_MAXSIZE))
+
+# RED-004 treats the book as settled once this many consecutive depth polls,
+# this far apart, agree
+BOOK_STABLE_POLLS = 5
+BOOK_STABLE_INTERVAL = 0.05
+
+# Tests in a wave run on worker threads, so each buffers its output lines
+# thread-locally and main() prints them together once the test finishes.
+_LOG = threading.local()
+
 
 # =============================================================================
 # Test Result Types
@@ -65,7 +96,7 @@ class TestStatus(Enum):
     ERROR = "ERROR"
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResult:
     test_id: str
     name: str
@@ -73,12 +104,30 @@ class TestResult:
     details: str = ""
     expected: str = ""
     actual: str = ""
+    log: List[str] = field(default_factory=list)
+    
+    # Summary icon per status
+    _ICON = {
+        TestStatus.PASS: "✅",
+        TestStatus.FAIL: "❌",
+        TestStatus.SKIP: "⏭️",
+        TestStatus.ERROR: "⚠️",
+    }
 
 
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
+def log(msg: str):
+    """Buffer an output line for the current test (printed directly outside run_test)"""
+    lines = getattr(_LOG, "lines", None)
+    if lines is None:
+        print(msg)
+    else:
+        lines.append(msg)
+
+
 def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
                 time_in_force: str = "GTC") -> Tuple[Optional[int], Optional[str], Dict]:
     order_data = {
@@ -90,12 +139,13 @@ def place_order(client: ApiClient, symbol: str, side: str, price: str, qty: str,
         "time_in_force": time_in_force,
     }
     resp = client.post("/api/v1/private/order", order_data)
-    if resp.status_code in [200, 202]:
-        data = resp.json()
+    invalidate_depth_cache()
+    if resp.status_code in ACCEPTED_CODES:
+        data = parse_json(resp)
         order_id = data.get("data", {}).get("order_id")
         status = data.get("data", {}).get("order_status", "")
         return order_id, status, data
-    return None, None, {"error": resp.status_code, "text": resp.text[:200]}
+    return None, None, {"error": resp.status_code, "text": body_snippet(resp)}
 
 
 def reduce_order(client: ApiClient, order_id: int, reduce_qty: str) -> Tuple[bool, Dict]:
@@ -109,68 +159,142 @@ def reduce_order(client: ApiClient, order_id: int, reduce_qty: str) -> Tuple[boo
         "reduce_qty": reduce_qty
     }
     resp = client.post("/api/v1/private/order/reduce", data)
+    invalidate_depth_cache()
     
     try:
-        resp_data = resp.json()
-    except:
-        resp_data = {"error": resp.text[:200]}
+        resp_data = parse_json(resp)
+    except ValueError:
+        resp_data = {"error": body_snippet(resp)}
     
-    return resp.status_code in [200, 202], resp_data
+    return resp.status_code in ACCEPTED_CODES, resp_data
 
 
 def get_order_status(client: ApiClient, order_id: int) -> Optional[str]:
     resp = client.get(f"/api/v1/private/order/{order_id}")
     if resp.status_code == 200:
-        return resp.json().get("data", {}).get("status")
+        return parse_json(resp).get("data", {}).get("status")
     return None
 
 
 def get_order_details(client: ApiClient, order_id: int) -> Optional[Dict]:
     resp = client.get(f"/api/v1/private/order/{order_id}")
     if resp.status_code == 200:
-        return resp.json().get("data", {})
+        return parse_json(resp).get("data", {})
     return None
 
 
 def cancel_order(client: ApiClient, order_id: int) -> bool:
     resp = client.delete(f"/api/v1/private/order/{order_id}")
-    return resp.status_code in [200, 202]
+    invalidate_depth_cache()
+    return resp.status_code in ACCEPTED_CODES
 
 
 def wait_for_order_terminal(client: ApiClient, order_id: int, timeout: float = 3.0) -> Optional[str]:
-    terminal_states = {"FILLED", "EXPIRED", "CANCELED", "REJECTED"}
-    start = time.time()
-    while time.time() - start < timeout:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
         status = get_order_status(client, order_id)
-        if status in terminal_states:
+        if status in TERMINAL_STATES:
             return status
-        time.sleep(0.1)
+        time.sleep(DEFAULT_INTERVAL)
     return get_order_status(client, order_id)
 
 
-def cleanup_order(client: ApiClient, order_id: Optional[int]):
-    if order_id:
+def cleanup_order(client: ApiClient, order_id: Optional[int], last_status: Optional[str] = None):
+    """Cancel a test's order, unless its last observed status is already terminal"""
+    if order_id and last_status not in TERMINAL_STATES:
         try:
             cancel_order(client, order_id)
-        except:
+        except (requests.RequestException, ValueError):
             pass
 
 
-def get_order_book(symbol: str) -> Dict:
-    resp = requests.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
-    if resp.status_code == 200:
-        return resp.json().get("data", {})
-    return {}
+def fetch_order_book(symbol: str) -> Optional[Dict[str, Dict[Decimal, str]]]:
+    """
+    Read order book depth from the gateway (None on failure)
+    
+    Returns {"bids": {price: qty}, "asks": {price: qty}} with Decimal price
+    keys: depth prices are decimal strings, so lookups are exact at any tick
+    size, unlike a float tolerance.
+    """
+    resp = SESSION.get(f"{GATEWAY_URL}/api/v1/public/depth?symbol={symbol}&limit=50", timeout=5)
+    if resp.status_code != 200:
+        return None
+    data = parse_json(resp).get("data", {})
+    return {side: {Decimal(level[0]): level[1] for level in data.get(side, []) if level}
+            for side in ("bids", "asks")}
+
+
+_DEPTH = DepthCache(fetch_order_book)
+
+
+def get_order_book(symbol: str) -> Dict[str, Dict[Decimal, str]]:
+    """Get order book depth, reusing a response younger than DEPTH_CACHE_TTL"""
+    return _DEPTH.get(symbol) or {}
+
+
+def invalidate_depth_cache():
+    """Drop cached depth after a request that changes the book"""
+    _DEPTH.invalidate()
 
 
 def check_order_in_book(symbol: str, side: str, price: str) -> bool:
+    """Check if a level at exactly this price exists on that side of the book"""
     depth = get_order_book(symbol)
-    levels = depth.get("bids" if side == "BUY" else "asks", [])
-    target_price = float(price)
-    for level in levels:
-        if len(level) >= 1 and abs(float(level[0]) - target_price) < 0.01:
-            return True
-    return False
+    return Decimal(price) in depth.get("bids" if side == "BUY" else "asks", {})
+
+
+def wait_for_order_in_book(symbol: str, side: str, price: str, timeout: float = 2.0) -> bool:
+    """Poll depth until a level at the given price shows up on that side"""
+    return poll_until(lambda: check_order_in_book(symbol, side, price), timeout=timeout)
+
+
+def wait_for_order_out_of_book(symbol: str, side: str, price: str, timeout: float = 1.0) -> bool:
+    """Poll depth until the level at the given price is gone; True if it still shows at timeout"""
+    return not poll_until(lambda: not check_order_in_book(symbol, side, price), timeout=timeout)
+
+
+def get_level_qty(symbol: str, side: str, price: str) -> Decimal:
+    """Get the total resting qty at a price level (0 if the level is absent)"""
+    depth = get_order_book(symbol)
+    levels = depth.get("bids" if side == "BUY" else "asks", {})
+    return Decimal(levels.get(Decimal(price), "0"))
+
+
+def wait_for_level_qty(symbol: str, side: str, price: str, qty: Decimal,
+                       timeout: float = 2.0) -> bool:
+    """
+    Poll depth until the level at `price` holds exactly `qty`
+    
+    A reduce doesn't change the order's status, so the book level is where
+    its effect shows up.
+    """
+    return poll_until(lambda: get_level_qty(symbol, side, price) == qty, timeout=timeout)
+
+
+def get_book_shape(symbol: str) -> Tuple[int, int]:
+    """(bid levels, ask levels) currently in the book"""
+    depth = get_order_book(symbol)
+    return len(depth.get("bids", [])), len(depth.get("asks", []))
+
+
+def wait_for_book_stable(symbol: str, polls: int = BOOK_STABLE_POLLS,
+                         interval: float = BOOK_STABLE_INTERVAL) -> Tuple[int, int]:
+    """
+    Poll the book shape until `polls` consecutive reads agree, and return it
+    
+    Stands in for a fixed settle delay when checking that a request had no
+    effect: the book must hold still for polls * interval seconds.
+    """
+    invalidate_depth_cache()
+    shape = get_book_shape(symbol)
+    agreeing = 1
+    while agreeing < polls:
+        time.sleep(interval)
+        invalidate_depth_cache()  # every poll must be a fresh read
+        current = get_book_shape(symbol)
+        agreeing = agreeing + 1 if current == shape else 1
+        shape = current
+    return shape
 
 
 # =============================================================================
@@ -193,7 +317,7 @@ def test_red_001_priority_preserved() -> TestResult:
     test_id = "RED-001"
     test_name = "ReduceOrder 优先级保留"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
@@ -202,28 +326,36 @@ def test_red_001_priority_preserved() -> TestResult:
     id_a = None
     id_b = None
     id_c = None
+    status_a = None
+    status_b = None
     
     try:
+        base_qty = get_level_qty(SYMBOL, "BUY", price)
+        
         # Step 1: Place Order A (first)
         id_a, _, _ = place_order(client_maker, SYMBOL, "BUY", price, "0.01", "GTC")
         if not id_a:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place Order A")
-        print(f"  Order A: {id_a} (qty=0.01)")
-        
-        time.sleep(0.3)  # Ensure time ordering
+        log(f"  Order A: {id_a} (qty=0.01)")
         
-        # Step 2: Place Order B (second)
+        # Step 2: Place Order B (second). A was already queued when its 202
+        # came back, so no sleep is needed for time ordering.
         id_b, _, _ = place_order(client_maker, SYMBOL, "BUY", price, "0.01", "GTC")
         if not id_b:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place Order B")
-        print(f"  Order B: {id_b} (qty=0.01)")
+        log(f"  Order B: {id_b} (qty=0.01)")
         
-        time.sleep(0.5)
+        # order_id doubles as the gateway's ingestion sequence number
+        if id_a >= id_b:
+            return TestResult(test_id, test_name, TestStatus.ERROR,
+                            details=f"Order A not sequenced before B: {id_a} >= {id_b}")
+        
+        wait_for_level_qty(SYMBOL, "BUY", price, base_qty + Decimal("0.02"))
         
         # Step 3: Reduce A by 0.005
-        print(f"  Reducing Order A by 0.005")
+        log(f"  Reducing Order A by 0.005")
         success, reduce_resp = reduce_order(client_maker, id_a, "0.005")
         
         if not success:
@@ -231,29 +363,27 @@ def test_red_001_priority_preserved() -> TestResult:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details=f"ReduceOrder not implemented or failed: {reduce_resp}")
         
-        time.sleep(0.5)
+        wait_for_level_qty(SYMBOL, "BUY", price, base_qty + Decimal("0.015"))
         
         # Step 4: Match with Sell C (0.007 - smaller than A's remaining + part of B)
-        print(f"  Matching with Sell 0.007 BTC")
+        log(f"  Matching with Sell 0.007 BTC")
         id_c, _, _ = place_order(client_taker, SYMBOL, "SELL", price, "0.007", "IOC")
         if not id_c:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place Order C")
         
-        time.sleep(1.0)
-        
         # Step 5: Verify A is FILLED (0.005 matched) and B is PARTIALLY_FILLED
-        status_a = get_order_status(client_maker, id_a)
+        status_a = wait_for_order_terminal(client_maker, id_a)
         status_b = get_order_status(client_maker, id_b)
         
-        print(f"  Order A status: {status_a}")
-        print(f"  Order B status: {status_b}")
+        log(f"  Order A status: {status_a}")
+        log(f"  Order B status: {status_b}")
         
         expected = "A=FILLED, B=PARTIALLY_FILLED (priority preserved)"
         actual = f"A={status_a}, B={status_b}"
         
         # A (0.005 remaining) should FILL before B gets matched
-        if status_a == "FILLED" and status_b in ["PARTIALLY_FILLED", "NEW", "ACCEPTED"]:
+        if status_a == "FILLED" and status_b in LIVE_STATES:
             return TestResult(test_id, test_name, TestStatus.PASS,
                             expected=expected, actual=actual)
         else:
@@ -265,8 +395,8 @@ def test_red_001_priority_preserved() -> TestResult:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
     
     finally:
-        cleanup_order(client_maker, id_a)
-        cleanup_order(client_maker, id_b)
+        cleanup_order(client_maker, id_a, status_a)
+        cleanup_order(client_maker, id_b, status_b)
 
 
 def test_red_002_reduce_to_zero() -> TestResult:
@@ -279,11 +409,12 @@ def test_red_002_reduce_to_zero() -> TestResult:
     test_id = "RED-002"
     test_name = "ReduceOrder 减量至零 (异步等待)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
     price = "54000.00"
     order_id = None
+    status = None
     
     try:
         # Place order
@@ -292,15 +423,14 @@ def test_red_002_reduce_to_zero() -> TestResult:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} (qty=0.001)")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} (qty=0.001)")
         
         # Verify order is in book
-        in_book_before = check_order_in_book(SYMBOL, "BUY", price)
-        print(f"  In book before reduce: {in_book_before}")
+        in_book_before = wait_for_order_in_book(SYMBOL, "BUY", price)
+        log(f"  In book before reduce: {in_book_before}")
         
         # Reduce to zero
-        print(f"  Reducing by full quantity (0.001)")
+        log(f"  Reducing by full quantity (0.001)")
         success, resp = reduce_order(client, order_id, "0.001")
         
         if not success:
@@ -308,19 +438,19 @@ def test_red_002_reduce_to_zero() -> TestResult:
                             details=f"ReduceOrder not implemented: {resp}")
         
         # 使用轮询等待异步处理完成 (关键修复: DEF-009)
-        print(f"  Waiting for terminal state...")
+        log(f"  Waiting for terminal state...")
         status = wait_for_order_terminal(client, order_id, 3.0)
         
         # Verify order removed from book
-        in_book_after = check_order_in_book(SYMBOL, "BUY", price)
+        in_book_after = wait_for_order_out_of_book(SYMBOL, "BUY", price)
         
-        print(f"  In book after reduce: {in_book_after}")
-        print(f"  Order status: {status}")
+        log(f"  In book after reduce: {in_book_after}")
+        log(f"  Order status: {status}")
         
         expected = "Not in book, status=CANCELED/EXPIRED"
         actual = f"in_book={in_book_after}, status={status}"
         
-        if not in_book_after and status in ["CANCELED", "EXPIRED"]:
+        if not in_book_after and status in CANCELED_STATES:
             return TestResult(test_id, test_name, TestStatus.PASS,
                             expected=expected, actual=actual)
         else:
@@ -331,7 +461,7 @@ def test_red_002_reduce_to_zero() -> TestResult:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
     
     finally:
-        cleanup_order(client, order_id)
+        cleanup_order(client, order_id, status)
 
 
 def test_red_003_exceed_quantity() -> TestResult:
@@ -345,12 +475,13 @@ def test_red_003_exceed_quantity() -> TestResult:
     test_id = "RED-003"
     test_name = "ReduceOrder 超过原数量 (截断取消)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
     price = "53000.00"
     original_qty = "0.001"
     order_id = None
+    status = None
     
     try:
         # Place order with qty 0.001
@@ -359,28 +490,26 @@ def test_red_003_exceed_quantity() -> TestResult:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} (qty={original_qty})")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} (qty={original_qty})")
         
         # 记录操作前订单簿状态
-        in_book_before = check_order_in_book(SYMBOL, "BUY", price)
-        print(f"  In book before: {in_book_before}")
+        in_book_before = wait_for_order_in_book(SYMBOL, "BUY", price)
+        log(f"  In book before: {in_book_before}")
         
         # Try to reduce by 0.002 (exceeds original 0.001)
         # Expected: reduce is truncated to 0.001, order is canceled
-        print(f"  Attempting to reduce by 0.002 (exceeds original {original_qty})")
+        log(f"  Attempting to reduce by 0.002 (exceeds original {original_qty})")
         success, resp = reduce_order(client, order_id, "0.002")
-        print(f"  Response: success={success}, data={resp}")
+        log(f"  Response: success={success}, data={resp}")
         
         # 等待异步处理
-        time.sleep(0.5)
+        status = wait_for_order_terminal(client, order_id)
         
         # 验证：订单从簿中移除，状态为 CANCELED
-        in_book_after = check_order_in_book(SYMBOL, "BUY", price)
-        status = get_order_status(client, order_id)
+        in_book_after = wait_for_order_out_of_book(SYMBOL, "BUY", price)
         
-        print(f"  In book after: {in_book_after}")
-        print(f"  Status: {status}")
+        log(f"  In book after: {in_book_after}")
+        log(f"  Status: {status}")
         
         expected = "Order removed from book, status=CANCELED (truncated reduce)"
         actual = f"in_book={in_book_after}, status={status}"
@@ -397,7 +526,7 @@ def test_red_003_exceed_quantity() -> TestResult:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
     
     finally:
-        cleanup_order(client, order_id)
+        cleanup_order(client, order_id, status)
 
 
 def test_red_004_nonexistent_order() -> TestResult:
@@ -411,36 +540,30 @@ def test_red_004_nonexistent_order() -> TestResult:
     test_id = "RED-004"
     test_name = "ReduceOrder 不存在订单 (异步验证)"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client = get_test_client(GATEWAY_URL, USER_MAKER)
     
     try:
         # 记录操作前订单簿状态
-        depth_before = get_order_book(SYMBOL)
-        bids_before = len(depth_before.get("bids", []))
-        asks_before = len(depth_before.get("asks", []))
+        bids_before, asks_before = get_book_shape(SYMBOL)
         
         fake_order_id = 9999999999
-        print(f"  Attempting to reduce non-existent order: {fake_order_id}")
+        log(f"  Attempting to reduce non-existent order: {fake_order_id}")
         
         # Gateway 异步入队
         success, resp = reduce_order(client, fake_order_id, "0.001")
-        print(f"  Response: success={success}, data={resp}")
-        
-        # 等待异步处理
-        time.sleep(0.5)
+        log(f"  Response: success={success}, data={resp}")
         
+        # 等待异步处理: 订单簿连续多次读取不变
         # 验证订单簿无变化
-        depth_after = get_order_book(SYMBOL)
-        bids_after = len(depth_after.get("bids", []))
-        asks_after = len(depth_after.get("asks", []))
+        bids_after, asks_after = wait_for_book_stable(SYMBOL)
         
         book_unchanged = (bids_before == bids_after and asks_before == asks_after)
         
-        print(f"  Order book before: bids={bids_before}, asks={asks_before}")
-        print(f"  Order book after:  bids={bids_after}, asks={asks_after}")
-        print(f"  Book unchanged: {book_unchanged}")
+        log(f"  Order book before: bids={bids_before}, asks={asks_before}")
+        log(f"  Order book after:  bids={bids_after}, asks={asks_after}")
+        log(f"  Book unchanged: {book_unchanged}")
         
         expected = "Request accepted, no side effects"
         actual = f"success={success}, book_unchanged={book_unchanged}"
@@ -469,41 +592,42 @@ def test_red_005_reduce_then_fill() -> TestResult:
     test_id = "RED-005"
     test_name = "ReduceOrder 后完全成交"
     
-    print(f"\n[{test_id}] {test_name}")
+    log(f"\n[{test_id}] {test_name}")
     
     client_maker = get_test_client(GATEWAY_URL, USER_MAKER)
     client_taker = get_test_client(GATEWAY_URL, USER_TAKER)
     
     price = "52000.00"
     order_id = None
+    status = None
     
     try:
+        base_qty = get_level_qty(SYMBOL, "BUY", price)
+        
         # Place order
         order_id, _, _ = place_order(client_maker, SYMBOL, "BUY", price, "0.01", "GTC")
         if not order_id:
             return TestResult(test_id, test_name, TestStatus.ERROR,
                             details="Failed to place order")
         
-        print(f"  Order: {order_id} (qty=0.01)")
-        time.sleep(0.5)
+        log(f"  Order: {order_id} (qty=0.01)")
+        wait_for_level_qty(SYMBOL, "BUY", price, base_qty + Decimal("0.01"))
         
         # Reduce by 0.003
-        print(f"  Reducing by 0.003")
+        log(f"  Reducing by 0.003")
         success, _ = reduce_order(client_maker, order_id, "0.003")
         if not success:
             return TestResult(test_id, test_name, TestStatus.SKIP,
                             details="ReduceOrder not implemented")
         
-        time.sleep(0.5)
+        wait_for_level_qty(SYMBOL, "BUY", price, base_qty + Decimal("0.007"))
         
         # Match with exactly remaining amount (0.007)
-        print(f"  Matching with Sell 0.007")
+        log(f"  Matching with Sell 0.007")
         place_order(client_taker, SYMBOL, "SELL", price, "0.007", "IOC")
         
-        time.sleep(1.0)
-        
-        status = get_order_status(client_maker, order_id)
-        print(f"  Order status: {status}")
+        status = wait_for_order_terminal(client_maker, order_id)
+        log(f"  Order status: {status}")
         
         expected = "FILLED"
         actual = status
@@ -519,13 +643,48 @@ def test_red_005_reduce_then_fill() -> TestResult:
         return TestResult(test_id, test_name, TestStatus.ERROR, details=str(e))
     
     finally:
-        cleanup_order(client_maker, order_id)
+        cleanup_order(client_maker, order_id, status)
 
 
 # =============================================================================
 # Main
 # =============================================================================
 
+# Tests in the same wave run on concurrent threads; signed requests on the
+# same user still go out one at a time (see ApiClient), so what overlaps is
+# the maker's and taker's traffic, depth polling and waits. Each test has its
+# own price, but a SELL IOC sweeps every bid at or above its price, so RED-005
+# (SELL @ 52000) gets its own wave; RED-004 compares whole-book level counts,
+# so it runs alone too.
+TEST_WAVES: List[List[Callable[[], TestResult]]] = [
+    [
+        test_red_001_priority_preserved,
+        test_red_002_reduce_to_zero,
+        test_red_003_exceed_quantity,
+    ],
+    [test_red_005_reduce_then_fill],
+    [test_red_004_nonexistent_order],
+]
+
+
+def run_test(test_fn: Callable[[], TestResult]) -> TestResult:
+    _LOG.lines = []
+    try:
+        result = test_fn()
+    except Exception as e:
+        result = TestResult("UNKNOWN", test_fn.__name__, TestStatus.ERROR, str(e))
+    finally:
+        lines, _LOG.lines = _LOG.lines, None
+    result.log = lines
+    return result
+
+
+def print_log(result: TestResult):
+    """Print a finished test's buffered output as one block"""
+    for line in result.log:
+        print(line)
+
+
 def main():
     print("=" * 70)
     print("🧪 QA 0x14-b: ReduceOrder Independent Test Suite")
@@ -533,58 +692,46 @@ def main():
     print(f"Gateway: {GATEWAY_URL}")
     print(f"Symbol: {SYMBOL}")
     
-    try:
-        resp = requests.get(f"{GATEWAY_URL}/api/v1/public/exchange_info", timeout=5)
-        if resp.status_code != 200:
-            print(f"\n❌ Gateway not responding: {resp.status_code}")
-            return 1
-    except Exception as e:
-        print(f"\n❌ Cannot connect to Gateway: {e}")
+    # Skipped when another module in this run probed within HEALTH_TTL
+    error = check_gateway(GATEWAY_URL, SESSION)
+    if error:
+        print(f"\n❌ {error}")
         return 1
     
     print("\n✅ Gateway connected")
     
-    tests = [
-        test_red_001_priority_preserved,
-        test_red_002_reduce_to_zero,
-        test_red_003_exceed_quantity,
-        test_red_004_nonexistent_order,
-        test_red_005_reduce_then_fill,
-    ]
+    # Build both clients up front so no test pays for key setup under the lock
+    for user_id in (USER_MAKER, USER_TAKER):
+        get_test_client(GATEWAY_URL, user_id)
     
+    # Every test cancels its own orders before returning, so a wave leaves
+    # nothing behind for the next one to match against
     results = []
-    for test_fn in tests:
-        try:
-            results.append(test_fn())
-        except Exception as e:
-            results.append(TestResult("UNKNOWN", test_fn.__name__, TestStatus.ERROR, str(e)))
+    with ThreadPoolExecutor(max_workers=max(len(w) for w in TEST_WAVES)) as ex:
+        for wave in TEST_WAVES:
+            for r in ex.map(run_test, wave):
+                print_log(r)
+                results.append(r)
+    results.sort(key=lambda r: r.test_id)
     
     print("\n")
     print("=" * 70)
     print("📊 REDUCEORDER TEST RESULTS")
     print("=" * 70)
     
-    passed = failed = skipped = errors = 0
+    counts = Counter(r.status for r in results)
     for r in results:
-        if r.status == TestStatus.PASS:
-            icon, passed = "✅", passed + 1
-        elif r.status == TestStatus.FAIL:
-            icon, failed = "❌", failed + 1
-        elif r.status == TestStatus.SKIP:
-            icon, skipped = "⏭️", skipped + 1
-        else:
-            icon, errors = "⚠️", errors + 1
-        
-        print(f"  {icon} [{r.test_id}] {r.name}: {r.status.value}")
+        print(f"  {TestResult._ICON[r.status]} [{r.test_id}] {r.name}: {r.status.value}")
         if r.status != TestStatus.PASS and r.status != TestStatus.SKIP:
             if r.expected: print(f"       Expected: {r.expected}")
             if r.actual: print(f"       Actual:   {r.actual}")
             if r.details: print(f"       Details:  {r.details}")
     
     print("=" * 70)
-    print(f"Summary: {passed} PASS, {failed} FAIL, {skipped} SKIP, {errors} ERROR")
+    print(f"Summary: {counts[TestStatus.PASS]} PASS, {counts[TestStatus.FAIL]} FAIL, "
+          f"{counts[TestStatus.SKIP]} SKIP, {counts[TestStatus.ERROR]} ERROR")
     
-    if failed > 0:
+    if counts[TestStatus.FAIL] > 0:
         print("\n⚠️  ReduceOrder Test Suite: FAILURES DETECTED")
         return 1
     